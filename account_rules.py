@@ -0,0 +1,116 @@
+import json
+import os
+
+import numpy as np
+
+NO_LIMIT = np.iinfo(np.int64).max
+
+def load_account_rules(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+class AccountRules:
+    """Apex tier limits compiled into lookup arrays.
+
+    Tiers are keyed by starting balance. Micro contracts count as 1 / ratio
+    of their full-size contract (10 MES = 1 ES, 25 FDXS = 1 FDAX); a micro
+    given as a bare symbol uses the global micro_ratio. Funded accounts trade
+    at a fraction of the cap until the balance clears the trailing threshold.
+    """
+
+    def __init__(self, rules):
+        tiers = rules.get("tiers", {})
+        scaling = rules.get("scaling", {})
+        self.micro_ratio = int(rules.get("micro_ratio", 10))
+        self.micro_symbols = {}  # micro -> full-size symbol
+        self.micro_ratios = {}  # micro -> micros per full-size contract
+        for k, v in rules.get("micro_symbols", {}).items():
+            if isinstance(v, dict):
+                self.micro_symbols[k.upper()] = str(v.get("full", "")).upper()
+                self.micro_ratios[k.upper()] = int(v.get("ratio", self.micro_ratio))
+            else:
+                self.micro_symbols[k.upper()] = str(v).upper()
+                self.micro_ratios[k.upper()] = self.micro_ratio
+        self.scaling_funded_only = bool(scaling.get("funded_only", True))
+        self.scaling_fraction = float(scaling.get("fraction", 1.0))
+
+        parsed = sorted((float(k), v) for k, v in tiers.items())
+        buffer = float(scaling.get("buffer", 0))
+        self.tier_sizes = np.array([k for k, _ in parsed], dtype=np.float64)
+        self.max_contracts = np.array([int(v["max_contracts"]) for _, v in parsed], dtype=np.int64)
+        self.trailing_drawdown = np.array([float(v.get("trailing_drawdown", 0)) for _, v in parsed], dtype=np.float64)
+        self.daily_loss_limit = np.array([float(v.get("daily_loss_limit", 0)) for _, v in parsed], dtype=np.float64)
+        # Balance a funded account must reach before the full cap applies
+        if scaling:
+            self.scaling_balance = np.array([k + float(v.get("trailing_drawdown", 0)) + buffer for k, v in parsed], dtype=np.float64)
+        else:
+            self.scaling_balance = np.zeros(len(parsed), dtype=np.float64)
+        self.index = {k: i for i, (k, _) in enumerate(parsed)}
+
+    def is_micro(self, symbol):
+        return str(symbol).upper() in self.micro_symbols
+
+    def micro_ratio_for(self, symbol):
+        # Contracts of `symbol` per full-size contract of the cap (1 for non-micros)
+        return self.micro_ratios.get(str(symbol).upper(), 1)
+
+    def max_for(self, tier, symbol="", funded=False, balance=None):
+        # Cap in contracts of `symbol` for one account, or None when the tier is unknown
+        try:
+            i = self.index[float(tier)]
+        except (KeyError, TypeError, ValueError):
+            return None
+        cap = int(self.max_contracts[i])
+        if funded or not self.scaling_funded_only:
+            if balance is not None and balance < self.scaling_balance[i]:
+                cap = int(cap * self.scaling_fraction)
+        return cap * self.micro_ratio_for(symbol)
+
+    def drawdown_for(self, tier):
+        # Trailing drawdown of a tier (the most the account can have at risk), or None
+        try:
+            return float(self.trailing_drawdown[self.index[float(tier)]])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def daily_loss_for(self, tier):
+        # Daily loss limit of a tier, or None when the tier is unknown or has none
+        try:
+            limit = float(self.daily_loss_limit[self.index[float(tier)]])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return limit or None
+
+    def clamp(self, tier, contracts, symbol="", funded=False, balance=None):
+        cap = self.max_for(tier, symbol, funded, balance)
+        if cap is not None and contracts > cap:
+            return cap, True
+        return contracts, False
+
+    def max_for_bulk(self, tiers, ratio=1, funded=None, balances=None):
+        # Vectorized caps for many accounts in contracts of one symbol (ratio from
+        # micro_ratio_for); unknown tiers get NO_LIMIT
+        tiers = np.asarray(tiers, dtype=np.float64)
+        if len(self.tier_sizes) == 0:
+            return np.full(tiers.shape, NO_LIMIT, dtype=np.int64)
+        idx = np.searchsorted(self.tier_sizes, tiers)
+        idx_clipped = np.minimum(idx, len(self.tier_sizes) - 1)
+        known = self.tier_sizes[idx_clipped] == tiers
+        caps = self.max_contracts[idx_clipped].copy()
+        if balances is not None:
+            scaled = np.asarray(balances, dtype=np.float64) < self.scaling_balance[idx_clipped]
+            if self.scaling_funded_only:
+                scaled &= np.asarray(funded if funded is not None else False, dtype=bool)
+            caps = np.where(scaled, (caps * self.scaling_fraction).astype(np.int64), caps)
+        caps = caps * np.asarray(ratio, dtype=np.int64)
+        return np.where(known, caps, NO_LIMIT)
+
+    def clamp_bulk(self, tiers, contracts, ratio=1, funded=None, balances=None):
+        caps = self.max_for_bulk(tiers, ratio, funded, balances)
+        contracts = np.asarray(contracts, dtype=np.int64)
+        return np.minimum(contracts, caps), contracts > caps
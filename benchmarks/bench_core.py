@@ -0,0 +1,295 @@
+"""Benchmarks for the catalog, search, sizing, scenario and config hot paths.
+
+    python benchmarks/bench_core.py run --out baseline.json
+    python benchmarks/bench_core.py run --sizes 60,10000 --out new.json
+    python benchmarks/bench_core.py compare baseline.json new.json --threshold 0.15
+
+Synthetic catalogs of 60, 10k and 200k rows are generated once (workbook and
+compiled module) under benchmarks/.cache. Each case reports ops/sec, latency
+percentiles (p50/p90/p99 in microseconds) and the peak traced memory of one
+call. ``compare`` exits 1 when a case's p50 got slower by more than the
+threshold.
+"""
+import argparse
+import datetime
+import gc
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+CACHE_DIR = os.path.join(BENCH_DIR, ".cache")
+sys.path.insert(0, REPO_DIR)
+
+import build_catalog
+import fpsc_core
+
+CATEGORIES = ["Equity Futures", "Currency Futures", "Agricultural Futures", "Energy Futures",
+              "Metal Futures", "Micro Futures", "Additional Instruments", "EUREX"]
+EXCHANGES = ["CME", "CBOT", "NYMEX", "COMEX", "EUREX"]
+WORDS = ["E-mini", "Micro", "Crude", "Gold", "Silver", "Nasdaq", "Dow", "Russell", "Euro", "Yen",
+         "Corn", "Wheat", "Soybean", "Cattle", "Copper", "Bund", "Schatz", "Bobl", "Stoxx", "Natural",
+         "Gas", "Oil", "Dollar", "Franc", "Pound", "Index", "Future", "Mini", "Treasury", "Note"]
+MONTHS = "FGHJKMNQUVXZ"
+QUERY_LENGTHS = [1, 2, 3, 5, 8]
+SCENARIO_SHAPES = [(100, 50), (500, 500), (1000, 2000)]  # scenarios x positions
+
+def synthetic_rows(n, seed=7):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        root = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(rng.randint(1, 3)))
+        rows.append({
+            "Name": " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 4))) + f" {MONTHS[i % 12]}{20 + i % 10}",
+            "Symbol": f"{root}{MONTHS[i % 12]}{i % 10}{i}",
+            "Exchange": rng.choice(EXCHANGES),
+            "Tick Size": rng.choice([0.25, 0.1, 0.01, 0.005, 1.0, 5e-05]),
+            "Point Value": rng.choice([5.0, 12.5, 20.0, 50.0, 100.0, 1000.0]),
+            "Category": rng.choice(CATEGORIES),
+        })
+    return rows
+
+def synthetic_instruments(n, seed=7):
+    # Same rows as the workbook, already in load_instruments() form
+    instruments = [{
+        "category": row["Category"], "name": row["Name"], "symbol": row["Symbol"], "exchange": row["Exchange"],
+        "tick_size": row["Tick Size"], "tick_value": row["Point Value"],
+    } for row in synthetic_rows(n, seed)]
+    return fpsc_core.apply_margins(instruments, {})
+
+def synthetic_workbook(n):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, f"catalog_{n}.xlsx")
+    if not os.path.exists(path):
+        import pandas as pd
+        pd.DataFrame(synthetic_rows(n)).to_excel(path, index=False)
+    return path
+
+def synthetic_module(n, workbook):
+    path = os.path.join(CACHE_DIR, f"catalog_{n}.py")
+    if not os.path.exists(path):
+        build_catalog.build(workbook, None, path)
+    return path
+
+def import_module_from(path):
+    spec = importlib.util.spec_from_file_location(f"bench_{os.path.basename(path)[:-3]}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+def bench(fn, min_time, max_iters, min_iters=3):
+    fn()  # warm up
+    gc.collect()
+    latencies = []
+    deadline = time.perf_counter() + min_time
+    while len(latencies) < max_iters and (len(latencies) < min_iters or time.perf_counter() < deadline):
+        t0 = time.perf_counter_ns()
+        fn()
+        latencies.append(time.perf_counter_ns() - t0)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    latencies.sort()
+    mean = statistics.fmean(latencies)
+    return {
+        "iterations": len(latencies),
+        "ops_per_sec": 1e9 / mean if mean else 0.0,
+        "p50_us": percentile(latencies, 0.50) / 1000.0,
+        "p90_us": percentile(latencies, 0.90) / 1000.0,
+        "p99_us": percentile(latencies, 0.99) / 1000.0,
+        "peak_kib": peak / 1024.0,
+    }
+
+def sizing_inputs(instruments, rng):
+    # Same string inputs the form hands to calculate(); presets are capped by the tier rules
+    cases = []
+    for _ in range(256):
+        inst = dict(rng.choice(instruments), intraday_margin=rng.choice([0.0, 500.0, 1000.0]))
+        tier, balance = rng.choice([("25,000", "25000"), ("50,000", "50000"), ("150,000", "152,600"), ("Custom", "12345.67")])
+        cases.append({
+            "tier": tier,
+            "account": balance,
+            "funded": rng.random() < 0.5,
+            "risk": rng.choice(["0.5", "1", "2", "250", "1250.0"]),
+            "risk_mode": rng.choice(["percent", "dollars"]),
+            "stop": str(rng.randint(1, 80)),
+            "tick_size": str(inst["tick_size"]),
+            "tick_value": str(inst["tick_value"]),
+            "instrument": inst,
+        })
+    return cases
+
+def sizing_form():
+    # FPSCApp over the versions harness's inert Tk stub, with a daily loss budget so
+    # calculate() runs the same margin, tier-cap and budget path as the GUI
+    from loss_limit import LossTracker
+    from versions_harness import FakeVar, install_tk_stub
+    install_tk_stub()
+    import fpsc_gui
+    form = fpsc_gui.FPSCApp.__new__(fpsc_gui.FPSCApp)
+    for attr in ("account_var", "risk_var", "risk_mode", "stop_var", "tick_size_var", "tick_value_var", "contracts_var",
+                 "result_var", "error_var", "binding_var", "account_combo", "funded_var", "profile_var"):
+        form.__dict__[attr] = FakeVar(value="")
+    form.__dict__.update({
+        "margin_type_var": FakeVar(value="Intraday"), "active_field": "risk", "is_updating": False,
+        "last_result": None, "save_last_used": lambda *a: None, "schedule_journal": lambda *a: None,
+        "ledger": None, "var_model": None, "loss_tracker": LossTracker(2000.0), "instrument_issue": None,
+    })
+    return form
+
+def sizing_calculate(form, case):
+    form.account_combo.set(case["tier"])
+    form.account_var.set(case["account"])
+    form.funded_var.set(case["funded"])
+    form.risk_mode.set(case["risk_mode"])
+    form.risk_var.set(case["risk"])
+    form.stop_var.set(case["stop"])
+    form.tick_size_var.set(case["tick_size"])
+    form.tick_value_var.set(case["tick_value"])
+    form.contracts_var.set("")
+    form.selected_instrument = case["instrument"]
+    form.calculate()
+    return form.result_var.get()
+
+def scenario_inputs(instruments, n_scenarios, n_positions, rng):
+    # Random category and symbol shocks over a book drawn from the catalog
+    import scenarios
+    scenario_list = []
+    for i in range(n_scenarios):
+        scenario_list.append({
+            "name": f"s{i}",
+            "categories": {c: rng.uniform(-10, 10) for c in rng.sample(CATEGORIES, 4)},
+            "symbols": {inst["symbol"]: rng.uniform(-15, 15) for inst in rng.sample(instruments, min(len(instruments), 5))},
+        })
+    held = [rng.choice(instruments) for _ in range(n_positions)]
+    book = {
+        "symbol": [str(inst["symbol"]).upper() for inst in held],
+        "category": [inst["category"] for inst in held],
+        "price": np.array([rng.uniform(10, 5000) for _ in held]),
+        "tick_size": np.array([inst["tick_size"] for inst in held]),
+        "point_value": np.array([inst["tick_value"] for inst in held]),
+        "contracts": np.array([rng.choice([-3, -1, 1, 2, 5]) for _ in held], dtype=np.float64),
+    }
+    return scenarios.ScenarioEngine(scenario_list), book
+
+def run(args):
+    rng = random.Random(11)
+    results = {}
+    sizing_pool = None
+
+    def record(name, fn, min_time=args.min_time, max_iters=args.max_iters):
+        results[name] = bench(fn, min_time, max_iters)
+        r = results[name]
+        print(f"{name:55} {r['ops_per_sec']:12.1f} ops/s  p50 {r['p50_us']:10.1f} us  p99 {r['p99_us']:10.1f} us  peak {r['peak_kib']:9.1f} KiB", file=sys.stderr)
+
+    for n in args.sizes:
+        workbook = synthetic_workbook(n)
+        module_path = synthetic_module(n, workbook)
+        slow = n > 10000
+        record(f"load_instruments[xlsx,{n}]", lambda: fpsc_core.parse_instruments(workbook, {}),
+               min_time=0 if slow else args.min_time, max_iters=1 if slow else 20)
+        module = import_module_from(module_path)
+        record(f"load_instruments[compiled,{n}]", lambda: fpsc_core.catalog_from_module(module), max_iters=200)
+
+        instruments, index = fpsc_core.catalog_from_module(module)
+        fpsc_core.set_catalog(instruments, index)
+        sizing_pool = sizing_pool or instruments
+        names = [inst["name"].lower() for inst in rng.sample(instruments, min(len(instruments), 50))]
+        for length in QUERY_LENGTHS:
+            queries = [name[:length] for name in names]
+            for category in ("All", CATEGORIES[0]):
+                it = iter(queries * (args.max_iters // len(queries) + 2))
+                record(f"filter_instruments[{n},len={length},{category}]",
+                       lambda: fpsc_core.filter_instruments(next(it), category))
+
+    cases = sizing_inputs(sizing_pool, rng)
+    form = sizing_form()
+    it = iter(cases * (args.max_iters // len(cases) + 2))
+    record("calculate[sizing]", lambda: sizing_calculate(form, next(it)))
+
+    for n_scenarios, n_positions in SCENARIO_SHAPES:
+        engine, book = scenario_inputs(sizing_pool, n_scenarios, n_positions, rng)
+        name = f"scenarios[{n_scenarios}x{n_positions}]"
+        record(name, lambda: engine.evaluate(book).sum(axis=1), max_iters=2000)
+        print(f"{'':55} {results[name]['ops_per_sec'] * n_scenarios * n_positions / 1e6:12.1f} M position-scenarios/s", file=sys.stderr)
+
+    workdir = tempfile.mkdtemp(prefix="fpsc-bench-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        config = {"account": "50000", "risk": "1", "risk_mode": "percent", "margin_type": "Intraday", "stop": "20",
+                  "contracts": "2", "contract_type": "All", "instrument": "es", "profile": ""}
+        record("save_config", lambda: fpsc_core.save_config(config), max_iters=5000)
+        record("load_config", fpsc_core.load_config, max_iters=5000)
+    finally:
+        os.chdir(cwd)
+
+    output = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": args.sizes,
+        },
+        "results": results,
+    }
+    text = json.dumps(output, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+def compare(args):
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)["results"]
+    with open(args.current, "r") as f:
+        current = json.load(f)["results"]
+    regressions = 0
+    for name in sorted(set(baseline) & set(current)):
+        before, after = baseline[name]["p50_us"], current[name]["p50_us"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -args.threshold:
+            flag = "  faster"
+        print(f"{name:55} {before:10.1f} -> {after:10.1f} us  {change * 100:+7.1f}%{flag}")
+    for name in sorted(set(baseline) - set(current)):
+        print(f"{name:55} missing from {args.current}")
+    print(f"{regressions} regression(s) beyond {args.threshold * 100:.0f}%")
+    return 1 if regressions else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Catalog, search, sizing and config benchmarks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_parser = sub.add_parser("run")
+    run_parser.add_argument("--sizes", default="60,10000,200000", type=lambda s: [int(x) for x in s.split(",")])
+    run_parser.add_argument("--min-time", type=float, default=0.5, help="seconds per case")
+    run_parser.add_argument("--max-iters", type=int, default=20000)
+    run_parser.add_argument("--out")
+    compare_parser = sub.add_parser("compare")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="allowed p50 slowdown (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+    return run(args) if args.command == "run" else compare(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
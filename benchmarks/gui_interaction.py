@@ -0,0 +1,186 @@
+"""Headless GUI interaction benchmark.
+
+Starts FPSCApp (under Xvfb when there is no display), scripts keystrokes,
+combobox selections and instrument picks, and times each interaction from the
+event to the point where Tk is idle again. Calls to calculate,
+update_instrument_dropdown and save_last_used are counted per interaction.
+
+    python benchmarks/gui_interaction.py --rounds 20 --out gui.json
+    python benchmarks/gui_interaction.py --catalog 10000 --max-p99-ms 16
+
+With --max-p99-ms the script exits 1 when any interaction's p99 is over the
+limit, so it can gate CI.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from startup import start_display
+
+COUNTED = ("calculate", "update_instrument_dropdown", "save_last_used")
+KEYSYMS = {" ": "space", ".": "period", "-": "minus", "&": "ampersand"}
+SEARCH_TERMS = ["crude", "gold", "micro", "nasdaq", "euro"]
+RISK_VALUES = ["0.5", "1.25", "2"]
+
+def counting_app():
+    # Subclass so the bound methods captured by traces and bindings are counted too
+    from fpsc_gui import FPSCApp
+
+    class CountingApp(FPSCApp):
+        def __init__(self):
+            self.counts = dict.fromkeys(COUNTED, 0)
+            super().__init__()
+
+    for name in COUNTED:
+        def wrapper(self, *args, _name=name, **kwargs):
+            self.counts[_name] += 1
+            return getattr(FPSCApp, _name)(self, *args, **kwargs)
+        setattr(CountingApp, name, wrapper)
+    return CountingApp()
+
+class Driver:
+    def __init__(self, app):
+        self.app = app
+        self.samples = {}
+
+    def interact(self, kind, action):
+        app = self.app
+        before = dict(app.counts)
+        t0 = time.perf_counter()
+        action()
+        app.update()
+        elapsed = (time.perf_counter() - t0) * 1000
+        sample = {"ms": elapsed}
+        sample.update({name: app.counts[name] - before[name] for name in COUNTED})
+        self.samples.setdefault(kind, []).append(sample)
+
+    def focus(self, widget):
+        widget.focus_force()
+        self.app.update()
+
+    def type_text(self, widget, text, kind):
+        self.focus(widget)
+        for ch in text:
+            self.interact(kind, lambda: widget.event_generate("<KeyPress>", keysym=KEYSYMS.get(ch, ch), when="tail"))
+
+    def clear(self, widget, kind):
+        self.focus(widget)
+        widget.icursor("end")
+        for _ in range(len(widget.get())):
+            self.interact(kind, lambda: widget.event_generate("<KeyPress>", keysym="BackSpace", when="tail"))
+
+    def select(self, combo, index, kind):
+        def action():
+            combo.current(index)
+            combo.event_generate("<<ComboboxSelected>>", when="tail")
+        self.interact(kind, action)
+
+    def pick(self, picker, index, kind):
+        self.interact(kind, lambda: picker.select(index))
+
+def scenario(driver, rounds):
+    app = driver.app
+    for r in range(rounds):
+        term = SEARCH_TERMS[r % len(SEARCH_TERMS)]
+        driver.type_text(app.instrument_search, term, "search_keystroke")
+        for i in range(min(len(app.instrument_picker.rows), 5)):
+            driver.pick(app.instrument_picker, i, "instrument_select")
+        driver.clear(app.instrument_search, "search_backspace")
+        categories = list(app.contract_combo["values"])
+        for i in range(len(categories)):
+            driver.select(app.contract_combo, i, "category_select")
+        driver.select(app.contract_combo, len(categories) - 1, "category_select")  # back to "All"
+        driver.clear(app.risk_entry, "risk_backspace")
+        driver.type_text(app.risk_entry, RISK_VALUES[r % len(RISK_VALUES)], "risk_keystroke")
+        driver.clear(app.stop_entry, "stop_backspace")
+        driver.type_text(app.stop_entry, str(10 + r % 30), "stop_keystroke")
+
+def summarize(samples):
+    summary = {}
+    for kind, rows in samples.items():
+        ms = sorted(r["ms"] for r in rows)
+        entry = {
+            "count": len(ms),
+            "p50_ms": ms[len(ms) // 2],
+            "p90_ms": ms[min(len(ms) - 1, int(len(ms) * 0.9))],
+            "p99_ms": ms[min(len(ms) - 1, int(len(ms) * 0.99))],
+            "max_ms": ms[-1],
+        }
+        for name in COUNTED:
+            entry[f"{name}_per_interaction"] = statistics.fmean(r[name] for r in rows)
+        summary[kind] = entry
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time scripted GUI interactions.")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--catalog", type=int, help="use a synthetic catalog with this many rows")
+    parser.add_argument("--max-p99-ms", type=float, help="fail when any interaction's p99 exceeds this")
+    parser.add_argument("--xvfb", action="store_true", help="always start Xvfb, even if DISPLAY is set")
+    parser.add_argument("--out", help="write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    xvfb = start_display() if args.xvfb or not os.environ.get("DISPLAY") else None
+    workdir = tempfile.mkdtemp(prefix="fpsc-gui-")
+    cwd = os.getcwd()
+    try:
+        import fpsc_core
+        if args.catalog:
+            from bench_core import synthetic_instruments
+            fpsc_core.set_catalog(synthetic_instruments(args.catalog))
+        else:
+            os.chdir(REPO_DIR)
+            fpsc_core.get_catalog()
+        os.chdir(workdir)  # keep config, journal and profiles out of the repo
+        app = counting_app()
+        app.update()
+        driver = Driver(app)
+        scenario(driver, args.rounds)
+        app.on_close()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+        if xvfb is not None:
+            xvfb.terminate()
+
+    summary = summarize(driver.samples)
+    output = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "rounds": args.rounds,
+            "catalog_rows": len(fpsc_core.get_catalog()[0]),
+        },
+        "interactions": summary,
+        "samples": driver.samples,
+    }
+    text = json.dumps(output, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    failed = False
+    for kind, s in summary.items():
+        over = args.max_p99_ms is not None and s["p99_ms"] > args.max_p99_ms
+        failed |= over
+        print(f"{'FAIL' if over else 'ok  '} {kind:18} p50 {s['p50_ms']:7.2f} ms  p99 {s['p99_ms']:7.2f} ms  "
+              f"calculate x{s['calculate_per_interaction']:.1f}  dropdown x{s['update_instrument_dropdown_per_interaction']:.1f}  "
+              f"save x{s['save_last_used_per_interaction']:.1f}", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
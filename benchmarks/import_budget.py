@@ -0,0 +1,83 @@
+"""Import-time budget check for each entry point.
+
+Runs every entry point in a fresh interpreter under ``-X importtime``, sums
+the cumulative time of the top-level imports it adds on top of a bare
+interpreter, and fails (exit 1) when an entry goes over its budget in
+import_budget.json or imports a module it must not load.
+
+    python benchmarks/import_budget.py            # check
+    python benchmarks/import_budget.py --json     # machine-readable report
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_budget.json")
+LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def import_profile(code):
+    # [(module, self_us, cumulative_us, depth)] in import order
+    env = dict(os.environ, PYTHONPATH=REPO_DIR, PYTHONDONTWRITEBYTECODE="")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=REPO_DIR, env=env,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{code!r} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), (len(m.group(3)) - 1) // 2))
+    return rows
+
+def measure(code, baseline, runs):
+    totals = []
+    for _ in range(runs):
+        rows = import_profile(code)
+        added = [r for r in rows if r[0] not in baseline]
+        totals.append(sum(r[2] for r in added if r[3] == 0) / 1000.0)
+    modules = {r[0] for r in added}
+    slowest = sorted(added, key=lambda r: r[1], reverse=True)[:10]
+    return statistics.median(totals), modules, [{"module": r[0], "self_ms": r[1] / 1000.0} for r in slowest]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check import time per entry point.")
+    parser.add_argument("--runs", type=int, default=5, help="runs per entry (median is checked)")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    with open(BUDGET_FILE, "r") as f:
+        budgets = json.load(f)
+    # Warm the bytecode cache so the first entry is not charged for compiling
+    import_profile("import fpsc_core, fpsc_gui, fanout")
+    baseline = {r[0] for r in import_profile("pass")}
+
+    report = {}
+    failed = False
+    for name, entry in budgets.items():
+        total_ms, modules, slowest = measure(entry["code"], baseline, args.runs)
+        forbidden = sorted(m for m in entry.get("forbidden", []) if m in modules)
+        ok = total_ms <= entry["budget_ms"] and not forbidden
+        failed |= not ok
+        report[name] = {"ok": ok, "import_ms": round(total_ms, 1), "budget_ms": entry["budget_ms"],
+                        "forbidden_imported": forbidden, "slowest": slowest}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for name, r in report.items():
+            status = "ok  " if r["ok"] else "FAIL"
+            print(f"{status} {name:8} {r['import_ms']:7.1f} ms / {r['budget_ms']} ms budget")
+            if r["forbidden_imported"]:
+                print(f"     imports forbidden modules: {', '.join(r['forbidden_imported'])}")
+            if not r["ok"]:
+                for s in r["slowest"][:5]:
+                    print(f"     {s['self_ms']:7.1f} ms  {s['module']}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
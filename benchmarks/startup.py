@@ -0,0 +1,139 @@
+"""Time-to-first-window / time-to-interactive benchmark.
+
+Launches the calculator repeatedly and reads the phase marks it writes when
+FPSC_STARTUP_REPORT is set. Each target runs from a fresh temp directory so
+config, journal and profile files never carry over between runs.
+
+    python benchmarks/startup.py --runs 10 --out startup.json
+    python benchmarks/startup.py --onedir dist/position_size_calculator/position_size_calculator \\
+                                 --onefile dist/position_size_calculator.exe
+
+Phases per run (milliseconds):
+    unpack            launch -> first line of the module (bootloader unpack + interpreter init)
+    imports           module start -> all imports done
+    load_instruments  imports -> catalog loaded
+    create_widgets    FPSCApp.__init__ -> widgets created
+    first_window      launch -> root window mapped
+    interactive       launch -> event loop idle after the first map
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(REPO_DIR, "position_size_calculator.py")
+DATA_FILES = ["apex_tradable_instruments.xlsx", "apex_margin_requirements.csv", "apex_account_rules.json"]
+PHASES = ["unpack", "imports", "load_instruments", "create_widgets", "first_window", "interactive"]
+
+def start_display():
+    # Headless X server when there is no display (or when asked for one explicitly)
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        return None
+    display = ":%d" % (90 + os.getpid() % 100)
+    proc = subprocess.Popen([xvfb, display, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(0.5)
+    os.environ["DISPLAY"] = display
+    return proc
+
+def phases_from(launch, marks):
+    return {
+        "unpack": (marks["module_start"] - launch) * 1000,
+        "imports": (marks["imports"] - marks["module_start"]) * 1000,
+        "load_instruments": (marks["load_instruments"] - marks["imports"]) * 1000,
+        "create_widgets": (marks["create_widgets"] - marks["app_init"]) * 1000,
+        "first_window": (marks["first_window"] - launch) * 1000,
+        "interactive": (marks["interactive"] - launch) * 1000,
+    }
+
+def run_once(command, timeout):
+    workdir = tempfile.mkdtemp(prefix="fpsc-startup-")
+    try:
+        for name in DATA_FILES:
+            if os.path.exists(os.path.join(REPO_DIR, name)):
+                shutil.copy(os.path.join(REPO_DIR, name), workdir)
+        report = os.path.join(workdir, "startup.json")
+        env = dict(os.environ, FPSC_STARTUP_REPORT=report, FPSC_STARTUP_EXIT="1")
+        launch = time.time()
+        proc = subprocess.run(command, cwd=workdir, env=env, timeout=timeout,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if not os.path.exists(report):
+            raise RuntimeError(f"{command[0]} exited with {proc.returncode} without a report: {proc.stderr.decode(errors='replace')[-500:]}")
+        with open(report, "r") as f:
+            data = json.load(f)
+        return phases_from(launch, data["marks"])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def summarize(runs):
+    summary = {}
+    for phase in PHASES:
+        values = [r[phase] for r in runs]
+        summary[phase] = {
+            "median": statistics.median(values),
+            "min": min(values),
+            "max": max(values),
+        }
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure calculator startup by phase.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs per target (fills OS caches)")
+    parser.add_argument("--no-python", action="store_true", help="skip the plain-Python target")
+    parser.add_argument("--onedir", help="path to the onedir build's executable")
+    parser.add_argument("--onefile", help="path to the onefile executable")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--xvfb", action="store_true", help="always start Xvfb, even if DISPLAY is set")
+    parser.add_argument("--out", help="write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    targets = {}
+    if not args.no_python:
+        targets["python"] = [sys.executable, SCRIPT]
+    if args.onedir:
+        targets["onedir"] = [os.path.abspath(args.onedir)]
+    if args.onefile:
+        targets["onefile"] = [os.path.abspath(args.onefile)]
+
+    xvfb = start_display() if args.xvfb or not os.environ.get("DISPLAY") else None
+    try:
+        results = {}
+        for name, command in targets.items():
+            for _ in range(args.warmup):
+                run_once(command, args.timeout)
+            runs = [run_once(command, args.timeout) for _ in range(args.runs)]
+            results[name] = {"command": command, "runs": runs, "summary": summarize(runs)}
+            print(f"{name}: first window {results[name]['summary']['first_window']['median']:.0f} ms, "
+                  f"interactive {results[name]['summary']['interactive']['median']:.0f} ms", file=sys.stderr)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+    output = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": args.runs,
+        },
+        "targets": results,
+    }
+    text = json.dumps(output, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Run the same workload against every calculator in versions/ and the current code.
+
+Tk is replaced by an inert stub before anything is imported, so v2/v3 (which
+build their window at import time) and the FPSCApp classes of v4+ load
+headlessly. Each version's own load_instruments, filter_instruments and
+calculate are driven through small adapters:
+
+    python benchmarks/versions_harness.py
+    python benchmarks/versions_harness.py --json results.json
+
+Outputs are checked against the current version on a golden input set; the
+table shows per-version latency (p50, microseconds) and peak memory.
+Exit status is 1 when a version disagrees on an input it supports.
+"""
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+import types
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+VERSIONS_DIR = os.path.join(REPO_DIR, "versions")
+sys.path.insert(0, REPO_DIR)
+
+# (account, risk, risk_mode, stop ticks, tick size, tick value)
+GOLDEN_INPUTS = [
+    ("50000", "1", "percent", "20", "0.25", "50.0"),
+    ("50000", "2", "percent", "8", "0.25", "20.0"),
+    ("25000", "0.5", "percent", "40", "0.01", "1000.0"),
+    ("150,000", "1.5", "percent", "12", "0.1", "100.0"),
+    ("100000", "0.25", "percent", "3", "0.25", "5.0"),
+    ("50000", "500", "dollars", "10", "0.25", "12.5"),
+    ("25000", "1250", "dollars", "25", "0.25", "50.0"),
+    ("300000", "3000", "dollars", "7", "1.0", "25.0"),
+    ("50000", "1", "percent", "0", "0.25", "50.0"),
+    ("50000", "0.01", "percent", "20", "0.25", "50.0"),
+]
+GOLDEN_QUERIES = ["", "e", "es", "mini", "gold", "micro", "nq", "oil", "dax", "zz"]
+RESULT = re.compile(r"(\d+)")
+
+# --- Tk stub
+class _Stub:
+    def __init__(self, *args, **kwargs):
+        pass
+    def __getattr__(self, name):
+        return _Stub()
+    def __call__(self, *args, **kwargs):
+        return _Stub()
+    def __getitem__(self, key):
+        return _Stub()
+    def __setitem__(self, key, value):
+        pass
+    def get(self, *args):
+        return ""
+
+class FakeVar:
+    def __init__(self, master=None, value="", name=None):
+        self.value = value
+    def get(self):
+        return self.value
+    def set(self, value):
+        self.value = value
+    def trace_add(self, *args, **kwargs):
+        pass
+    trace = trace_add
+
+class _StubModule(types.ModuleType):
+    def __getattr__(self, name):
+        return _Stub
+
+def install_tk_stub():
+    tk = _StubModule("tkinter")
+    tk.Tk = type("Tk", (_Stub,), {})
+    tk.StringVar = tk.IntVar = tk.DoubleVar = tk.BooleanVar = FakeVar
+    tk.ttk = _StubModule("tkinter.ttk")
+    tk.messagebox = _StubModule("tkinter.messagebox")
+    sys.modules["tkinter"] = tk
+    sys.modules["tkinter.ttk"] = tk.ttk
+    sys.modules["tkinter.messagebox"] = tk.messagebox
+
+# --- Adapters
+def import_version(path):
+    name = "fpsc_" + os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def contracts_from(result_text):
+    m = RESULT.search(result_text or "")
+    return int(m.group(1)) if m else 0
+
+class ScriptVersion:
+    # v2/v3: module-level widgets and calculate_position_size()
+    def __init__(self, name, module):
+        self.name = name
+        self.module = module
+        self.has_dollars = hasattr(module, "risk_type_var")
+
+    def supports(self, case):
+        return case[2] == "percent" or self.has_dollars
+
+    def calculate(self, case):
+        account, risk, mode, stop, _tick_size, tick_value = case
+        m = self.module
+        m.entry_account_size = FakeVar(value=account.replace(",", ""))
+        m.entry_stop_loss = FakeVar(value=stop)
+        m.tick_value_var = FakeVar(value=tick_value)
+        m.result_var = FakeVar()
+        if self.has_dollars:
+            m.entry_risk_value = FakeVar(value=risk)
+            m.risk_type_var = FakeVar(value="Dollars" if mode == "dollars" else "Percentage")
+        else:
+            m.entry_risk_percent = FakeVar(value=risk)
+        try:
+            m.calculate_position_size()
+        except ZeroDivisionError:
+            return 0
+        return contracts_from(m.result_var.get())
+
+class AppVersion:
+    # v4+: FPSCApp.calculate() over Tk variables, plus module-level catalog functions
+    def __init__(self, name, module, app_class, load_instruments, filter_instruments):
+        self.name = name
+        self.module = module
+        self.app_class = app_class
+        self.load_instruments = load_instruments
+        self.filter_instruments = filter_instruments
+
+    def supports(self, case):
+        return True
+
+    def calculate(self, case):
+        account, risk, mode, stop, tick_size, tick_value = case
+        form = self.app_class.__new__(self.app_class)
+        values = {
+            "account_var": account, "risk_var": risk, "risk_mode": mode, "stop_var": stop,
+            "tick_size_var": tick_size, "tick_value_var": tick_value, "contracts_var": "",
+            "result_var": "", "error_var": "", "binding_var": "", "margin_type_var": "Off",
+        }
+        for attr, value in values.items():
+            form.__dict__[attr] = FakeVar(value=value)
+        form.__dict__.update({
+            "active_field": "risk", "is_updating": False, "selected_instrument": None, "last_result": None,
+            "save_last_used": lambda *a: None, "schedule_journal": lambda *a: None,
+            "ledger": None, "var_model": None, "loss_tracker": None, "instrument_issue": None,
+        })
+        form.calculate()
+        return contracts_from(form.result_var.get())
+
+def load_versions():
+    install_tk_stub()
+    versions = []
+    for filename in sorted(os.listdir(VERSIONS_DIR)):
+        if not filename.endswith(".py"):
+            continue
+        module = import_version(os.path.join(VERSIONS_DIR, filename))
+        name = re.search(r"(v\d+)", filename).group(1)
+        if hasattr(module, "FPSCApp"):
+            versions.append(AppVersion(name, module, module.FPSCApp, module.load_instruments, module.filter_instruments))
+        else:
+            versions.append(ScriptVersion(name, module))
+    import fpsc_core
+    import fpsc_gui
+    versions.append(AppVersion("current", fpsc_core, fpsc_gui.FPSCApp, fpsc_core.load_instruments,
+                               lambda query: fpsc_core.filter_instruments(query)))
+    return versions
+
+# --- Workload
+def timed(fn, iterations):
+    fn()
+    gc.collect()
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - t0)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"p50_us": statistics.median(samples) / 1000.0, "peak_kib": peak / 1024.0}
+
+def catalog_signature(instruments):
+    return [(str(i["symbol"]), float(i["tick_size"]), float(i["tick_value"])) for i in instruments]
+
+def run(iterations):
+    os.chdir(REPO_DIR)  # v4-v6 read the workbook relative to the working directory
+    versions = load_versions()
+    reference = versions[-1]
+    ref_contracts = [reference.calculate(case) for case in GOLDEN_INPUTS]
+    ref_catalog = catalog_signature(reference.load_instruments())
+    ref_filter = {q: [i["symbol"] for i in reference.filter_instruments(q)] for q in GOLDEN_QUERIES}
+
+    report = {}
+    for v in versions:
+        row = {"mismatches": []}
+        cases = [c for c in GOLDEN_INPUTS if v.supports(c)]
+        for case, expected in zip(GOLDEN_INPUTS, ref_contracts):
+            if v.supports(case):
+                got = v.calculate(case)
+                if got != expected:
+                    row["mismatches"].append({"function": "calculate", "input": case, "expected": expected, "got": got})
+        it = iter(cases * (iterations + 2))
+        row["calculate"] = timed(lambda: v.calculate(next(it)), iterations)
+
+        if isinstance(v, AppVersion):
+            if catalog_signature(v.load_instruments()) != ref_catalog:
+                row["mismatches"].append({"function": "load_instruments", "input": None})
+            for query, expected in ref_filter.items():
+                got = [i["symbol"] for i in v.filter_instruments(query)]
+                if got != expected:
+                    row["mismatches"].append({"function": "filter_instruments", "input": query, "expected": expected, "got": got})
+            row["load_instruments"] = timed(v.load_instruments, max(3, iterations // 200))
+            queries = iter(GOLDEN_QUERIES * (iterations + 2))
+            row["filter_instruments"] = timed(lambda: v.filter_instruments(next(queries)), iterations)
+        report[v.name] = row
+    return report
+
+def print_table(report):
+    header = f"{'version':8} {'load_instruments':>26} {'filter_instruments':>24} {'calculate':>20}  mismatches"
+    print(header)
+    print("-" * len(header))
+    for name, row in report.items():
+        cells = []
+        for fn, width in (("load_instruments", 26), ("filter_instruments", 24), ("calculate", 20)):
+            r = row.get(fn)
+            cells.append(f"{r['p50_us']:>9.1f} us {r['peak_kib']:>7.1f} KiB".rjust(width) if r else "n/a".rjust(width))
+        print(f"{name:8} {' '.join(cells)}  {len(row['mismatches'])}")
+        for m in row["mismatches"]:
+            detail = f" expected {m['expected']}, got {m['got']}" if "expected" in m else ""
+            print(f"         {m['function']}({m['input']!r}){detail}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare behavior and speed across calculator versions.")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--json", help="also write the report here")
+    args = parser.parse_args(argv)
+    report = run(args.iterations)
+    print_table(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if any(row["mismatches"] for row in report.values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Compile the instrument workbook into catalog_data.py.
+
+Run before freezing (position_size_calculator.spec calls it). The generated
+module holds the catalog as column tuples plus the search index, so the app
+loads it from bytecode without importing pandas or openpyxl. It records the
+SHA-1 of the workbook and margin file it was built from; if the live files
+differ at startup, the app falls back to parsing them.
+
+    python build_catalog.py [--out catalog_data.py]
+"""
+import argparse
+import math
+import os
+
+import fpsc_core as fpsc
+
+OUTPUT_FILE = "catalog_data.py"
+COLUMNS = ("category", "name", "symbol", "exchange", "tick_size", "tick_value",
+           "intraday_margin", "initial_margin", "maintenance_margin")
+TEXT_COLUMNS = {"category": "Other", "name": "", "symbol": "", "exchange": ""}
+
+def _literal(value):
+    if isinstance(value, float) and math.isnan(value):
+        return 'float("nan")'
+    return repr(value)
+
+def _column(instruments, col):
+    values = []
+    for inst in instruments:
+        value = inst.get(col)
+        if col in TEXT_COLUMNS:
+            value = TEXT_COLUMNS[col] if value is None or (isinstance(value, float) and math.isnan(value)) else str(value)
+        else:
+            value = float(value)
+        values.append(_literal(value))
+    return "(" + "".join(v + ", " for v in values) + ")"
+
+def build(workbook, margin_file, out):
+    instruments, validation = fpsc.parse_catalog(workbook, fpsc.load_margins(margin_file))
+    for inst in instruments:
+        for col, default in TEXT_COLUMNS.items():
+            value = inst.get(col)
+            if value is None or (isinstance(value, float) and math.isnan(value)):
+                inst[col] = default
+            else:
+                inst[col] = str(value)
+    index = fpsc.build_search_index(instruments)
+    lines = [
+        f"# Generated by build_catalog.py from {os.path.basename(workbook)} - do not edit.",
+        f"SOURCE_SHA1 = {fpsc.file_sha1(workbook)!r}",
+        f"MARGIN_SHA1 = {fpsc.file_sha1(margin_file)!r}",
+        f"COLUMNS = {COLUMNS!r}",
+    ]
+    for col in COLUMNS:
+        lines.append(f"{col.upper()} = {_column(instruments, col)}")
+    lines.append(f"SEARCH_TEXT = {tuple(index['text'])!r}")
+    lines.append(f"SYMBOL_INDEX = {index['symbols']!r}")
+    lines.append(f"VALID = {validation['valid']!r}")
+    lines.append(f"REPORT = {validation['report']!r}")
+    lines.append(f"CATEGORY_INDEX = {{{', '.join(f'{k!r}: {tuple(v)!r}' for k, v in index['categories'].items())}}}")
+    with open(out, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return validation["report"]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile the instrument workbook into a Python module.")
+    parser.add_argument("--workbook", default=fpsc.INSTRUMENT_FILE)
+    parser.add_argument("--margins", default=fpsc.MARGIN_FILE)
+    parser.add_argument("--out", default=OUTPUT_FILE)
+    args = parser.parse_args(argv)
+    margin_file = args.margins if os.path.exists(args.margins) else None
+    report = build(args.workbook, margin_file, args.out)
+    print(f"Wrote {report['rows']} instruments to {args.out}")
+    if report["issues"]:
+        from catalog_validation import format_report
+        print(format_report(report))
+
+if __name__ == "__main__":
+    main()
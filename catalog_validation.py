@@ -0,0 +1,110 @@
+"""Catalog validation: every row checked in one vectorized pass.
+
+Checks (a row failing any error check is invalid):
+
+- tick_size, point_value: missing, unparseable or not positive
+- symbol: empty, or a duplicate of an earlier row (the first one is kept)
+- tick_value: only when the workbook has a ``Tick Value`` column; it must
+  equal Point Value x Tick Size
+- category (warning only): not one of fpsc_core.CATEGORIES
+
+The result is a report plus a "valid" bitmap (np.packbits, one bit per row,
+most significant bit first). build_catalog.py stores both in catalog_data.py,
+so startup never re-validates; fpsc_core.instrument_valid(i) reads a bit.
+
+    python catalog_validation.py [workbook]
+"""
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from fpsc_core import CATEGORIES, INSTRUMENT_FILE
+
+ERROR_CHECKS = ("tick_size", "point_value", "symbol", "tick_value")
+WARNING_CHECKS = ("category",)
+MESSAGES = {
+    "tick_size": "tick size is missing or not positive",
+    "point_value": "point value is missing or not positive",
+    "symbol": "symbol is empty or duplicates an earlier row",
+    "tick_value": "tick value does not equal point value x tick size",
+    "category": "unknown category",
+}
+
+def validate(symbols, categories, tick_size, point_value, tick_value=None, known_categories=CATEGORIES):
+    """Returns {"valid": packed bitmap bytes, "report": {...}} for the given columns.
+
+    Numeric columns may hold NaN for unparseable cells.
+    """
+    tick_size = np.asarray(tick_size, dtype=np.float64)
+    point_value = np.asarray(point_value, dtype=np.float64)
+    n = len(tick_size)
+    symbols = np.char.upper(np.char.strip(np.asarray(symbols, dtype=str)))
+    flags = {
+        "tick_size": ~(tick_size > 0),  # NaN compares False
+        "point_value": ~(point_value > 0),
+    }
+    _, first, inverse = np.unique(symbols, return_index=True, return_inverse=True)
+    flags["symbol"] = (symbols == "") | (first[inverse.reshape(-1)] != np.arange(n))
+    if tick_value is not None:
+        tick_value = np.asarray(tick_value, dtype=np.float64)
+        numbers_ok = ~(flags["tick_size"] | flags["point_value"])  # already reported above
+        flags["tick_value"] = numbers_ok & ~np.isclose(tick_value, point_value * tick_size, rtol=1e-6, atol=1e-12)
+    flags["category"] = ~np.isin(np.asarray(categories, dtype=str), list(known_categories))
+
+    invalid = np.zeros(n, dtype=bool)
+    for check in ERROR_CHECKS:
+        if check in flags:
+            invalid |= flags[check]
+    issues = []
+    flagged = np.zeros(n, dtype=bool)
+    for mask in flags.values():
+        flagged |= mask
+    for i in np.flatnonzero(flagged).tolist():
+        for check, mask in flags.items():
+            if mask[i]:
+                issues.append({"row": i, "symbol": str(symbols[i]), "check": check, "message": MESSAGES[check]})
+    report = {
+        "rows": n,
+        "valid": int(n - invalid.sum()),
+        "errors": {c: int(flags[c].sum()) for c in ERROR_CHECKS if c in flags},
+        "warnings": {c: int(flags[c].sum()) for c in WARNING_CHECKS},
+        "issues": issues,
+    }
+    return {"valid": np.packbits(~invalid).tobytes(), "report": report}
+
+def validate_frame(df):
+    # Same checks over the raw workbook sheet
+    import pandas as pd
+    column = lambda name: pd.to_numeric(df[name], errors="coerce").to_numpy(np.float64)
+    return validate(
+        df["Symbol"].fillna("").astype(str).to_numpy(),
+        df["Category"].fillna("Other").astype(str).to_numpy() if "Category" in df else np.full(len(df), "Other"),
+        column("Tick Size"),
+        column("Point Value"),
+        column("Tick Value") if "Tick Value" in df else None,
+    )
+
+def format_report(report):
+    lines = [f"{report['valid']} of {report['rows']} rows valid"]
+    for kind in ("errors", "warnings"):
+        counts = ", ".join(f"{c}: {k}" for c, k in report[kind].items() if k)
+        if counts:
+            lines.append(f"{kind}: {counts}")
+    for issue in report["issues"]:
+        lines.append(f"  row {issue['row'] + 2} {issue['symbol'] or '(no symbol)'}: {issue['message']}")  # +2: header, 1-based
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate the instrument workbook.")
+    parser.add_argument("workbook", nargs="?", default=INSTRUMENT_FILE)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    import pandas as pd
+    report = validate_frame(pd.read_excel(args.workbook))["report"]
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0 if report["valid"] == report["rows"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Ctrl+K command palette: type "NQ 20t 1%" and press Enter to fill the form."""
+import tkinter as tk
+
+from commands import parse_command, resolve_instrument
+from fpsc_core import get_catalog
+
+HINT = 'Symbol, stop and risk, e.g. "NQ 20t 1%", "crude 15t $400", "ES 8t 2c"'
+
+class CommandPalette(tk.Toplevel):
+    def __init__(self, app):
+        super().__init__(app)
+        self.app = app
+        self.title("Command")
+        self.transient(app)
+        self.resizable(False, False)
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.command = None
+        self.position = None
+
+        self.text_var = tk.StringVar()
+        self.preview_var = tk.StringVar(value=HINT)
+        self.entry = tk.Entry(self, textvariable=self.text_var, width=40, font=("Arial", 12))
+        self.entry.pack(fill="x", padx=8, pady=(8, 4))
+        self.preview_label = tk.Label(self, textvariable=self.preview_var, fg="grey", anchor="w", justify="left")
+        self.preview_label.pack(fill="x", padx=8, pady=(0, 8))
+
+        self.text_var.trace_add("write", self.preview)
+        self.entry.bind("<Return>", self.run)
+        self.bind("<Escape>", self.close)
+        self.entry.focus_set()
+
+    def preview(self, *args):
+        self.command = None
+        try:
+            command = parse_command(self.text_var.get())
+        except ValueError as e:
+            self.show(str(e), "red")
+            return
+        position = resolve_instrument(command["query"]) if "query" in command else None
+        if "query" in command and position is None:
+            self.show(f"No instrument matches {command['query']!r}", "red")
+            return
+        parts = []
+        if position is not None:
+            inst = get_catalog()[0][position]
+            parts.append(f"{inst['name']} ({inst['symbol']})")
+        if "stop" in command:
+            parts.append(f"stop {command['stop']:g} ticks")
+        if "risk" in command:
+            parts.append(f"risk {command['risk']:g}%" if command["risk_mode"] == "percent" else f"risk ${command['risk']:,.2f}")
+        if "contracts" in command:
+            parts.append(f"{command['contracts']} contracts")
+        self.command, self.position = command, position
+        self.show(", ".join(parts) if parts else HINT, "grey")
+
+    def show(self, text, color):
+        self.preview_var.set(text)
+        self.preview_label.config(fg=color)
+
+    def run(self, event=None):
+        if not self.command:
+            return
+        command, position = self.command, self.position
+        self.close()
+        self.app.apply_command(command, position)
+
+    def close(self, event=None):
+        self.app.command_palette = None
+        self.destroy()
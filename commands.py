@@ -0,0 +1,96 @@
+"""Parser for the command palette: "NQ 20t 1%" -> symbol, stop and risk.
+
+The grammar is table driven and built once at import:
+
+    command := token*
+    token   := ["$"] number [unit] | word
+    unit    := "t" | "ticks" | "%" | "$" | "c" | ...   (see UNITS)
+
+A bare number may take its unit from the next token ("20 t"). A token that
+is a catalog symbol is always a word, so "6E" is not read as 6 of unit "e".
+Parsing is one pass over the whitespace-split tokens with set and dict
+lookups; words are joined into a query and resolved through the catalog's
+symbol hash, falling back to the search index.
+"""
+from fpsc_core import filter_indices, get_catalog
+
+UNITS = {
+    "t": "stop", "tk": "stop", "tick": "stop", "ticks": "stop",
+    "%": "percent", "pct": "percent",
+    "$": "dollars", "usd": "dollars",
+    "c": "contracts", "ct": "contracts", "lot": "contracts", "lots": "contracts", "x": "contracts",
+}
+NUMBER_CHARS = frozenset("0123456789.,")
+
+def split_number(token):
+    # "20t" -> ("20", "t"), "$500" -> ("500", "$"), "1.5%" -> ("1.5", "%"), "nq" -> (None, "")
+    start = 1 if token[0] == "$" else 0
+    end = start
+    while end < len(token) and token[end] in NUMBER_CHARS:
+        end += 1
+    if end == start or token[start:end].strip(".,") == "":
+        return None, ""
+    if start and end < len(token):
+        raise ValueError(f"Unexpected {token[end:]!r} after {token[:end]}")
+    return token[start:end], "$" if start else token[end:]
+
+def assign(command, number, unit):
+    field = UNITS.get(unit)
+    if field is None:
+        raise ValueError(f"Unknown unit {unit!r} after {number}")
+    try:
+        value = float(number.replace(",", ""))
+    except ValueError:
+        raise ValueError(f"Not a number: {number}")
+    if field == "stop":
+        command["stop"] = value
+    elif field == "contracts":
+        if value != int(value):
+            raise ValueError("Contracts must be a whole number")
+        command["contracts"] = int(value)
+        command.pop("risk", None)
+    else:
+        command["risk"] = value
+        command["risk_mode"] = field
+        command.pop("contracts", None)
+
+def parse_command(text):
+    """Parse palette input into a dict with any of query, stop, risk, risk_mode, contracts.
+
+    Raises ValueError with a message suitable for showing to the user.
+    """
+    command = {}
+    words = []
+    pending = None  # bare number waiting for its unit
+    symbols = get_catalog()[1]["symbols"]
+    for token in text.lower().split():
+        if pending is not None and token in UNITS:
+            assign(command, pending, token)
+            pending = None
+            continue
+        if pending is not None:
+            raise ValueError(f"{pending} needs a unit (t, %, $ or c)")
+        if token.upper() in symbols:
+            words.append(token)
+            continue
+        number, unit = split_number(token)
+        if number is None:
+            words.append(token)
+        elif unit:
+            assign(command, number, unit)
+        else:
+            pending = number
+    if pending is not None:
+        raise ValueError(f"{pending} needs a unit (t, %, $ or c)")
+    if words:
+        command["query"] = " ".join(words)
+    return command
+
+def resolve_instrument(query):
+    # Catalog position for an exact symbol, else the first search match, else None
+    index = get_catalog()[1]
+    i = index["symbols"].get(query.upper())
+    if i is None:
+        matches = filter_indices(query)
+        i = matches[0] if matches else None
+    return i
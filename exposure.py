@@ -0,0 +1,141 @@
+"""Open-position exposure ledger with O(1) running totals.
+
+Every fill (open) and close is appended to a log as one JSON line, and the
+stop risk of the position is added to or taken from running totals per
+account, category and exchange, so both updates and budget queries are O(1).
+On start the ledger loads the last snapshot and replays the log. Once the
+log holds COMPACT_EVENTS events, the open positions are written to a new
+snapshot (atomically) and the log starts over. Replay is idempotent (opens
+carry their id), so a crash between the two steps loses nothing.
+
+Listeners (e.g. PortfolioRisk.on_ledger_event) get ("open" | "close", position)
+after each change.
+"""
+import json
+import os
+
+from fpsc_core import POSITIONS_FILE, POSITIONS_LOG
+
+COMPACT_EVENTS = 1000
+
+def position_side(entry, stop):
+    # +1 long, -1 short: a stop above the entry means short; unknown counts as long
+    return -1 if entry is not None and stop is not None and stop > entry else 1
+
+class ExposureLedger:
+    def __init__(self, snapshot_path=POSITIONS_FILE, log_path=POSITIONS_LOG):
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path
+        self.positions = {}  # id -> position, in opening order
+        self.next_id = 1
+        self.by_account = {}
+        self.by_category = {}
+        self.by_exchange = {}
+        self.listeners = []
+        self.log_events = 0
+        self.load()
+        self.log = open(log_path, "a")
+
+    # --- Persistence
+    def load(self):
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, "r") as f:
+                    data = json.load(f)
+                for p in data.get("positions", []):
+                    self.apply_open(p)
+                self.next_id = max(self.next_id, int(data.get("next_id", 1)))
+            except Exception:
+                pass
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "r") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line after a crash
+                    if event.get("op") == "open":
+                        self.apply_open(event["position"])
+                    elif event.get("op") == "close":
+                        self.apply_close(event["id"])
+                    self.log_events += 1
+
+    def append(self, event):
+        self.log.write(json.dumps(event) + "\n")
+        self.log.flush()
+        self.log_events += 1
+        if self.log_events >= COMPACT_EVENTS:
+            self.compact()
+
+    def compact(self):
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"positions": list(self.positions.values()), "next_id": self.next_id}, f)
+        os.replace(tmp, self.snapshot_path)
+        self.log.close()
+        self.log = open(self.log_path, "w")
+        self.log_events = 0
+
+    def close_log(self):
+        self.log.close()
+
+    # --- State changes
+    def apply_open(self, p):
+        if p["id"] in self.positions:
+            return None
+        p.setdefault("account", "")
+        p.setdefault("category", "")
+        p.setdefault("exchange", "")
+        p.setdefault("side", position_side(p.get("entry"), p.get("stop")))
+        self.positions[p["id"]] = p
+        self.next_id = max(self.next_id, p["id"] + 1)
+        self.add_totals(p, p["risk"])
+        return p
+
+    def apply_close(self, position_id):
+        p = self.positions.pop(position_id, None)
+        if p is not None:
+            self.add_totals(p, -p["risk"])
+        return p
+
+    def add_totals(self, p, risk):
+        for totals, key in ((self.by_account, p["account"]), (self.by_category, p["category"]), (self.by_exchange, p["exchange"])):
+            total = totals.get(key, 0.0) + risk
+            if abs(total) < 1e-9:
+                totals.pop(key, None)
+            else:
+                totals[key] = total
+
+    def open(self, account, symbol, contracts, risk, entry=None, stop=None, category="", exchange="", side=None):
+        """Record a fill; risk is the dollar loss at the stop (positive), side +1 long / -1 short."""
+        if side is None:
+            side = position_side(entry, stop)
+        p = {"id": self.next_id, "account": account, "symbol": symbol, "contracts": contracts, "side": side,
+             "entry": entry, "stop": stop, "risk": risk, "category": category, "exchange": exchange}
+        self.apply_open(p)
+        self.append({"op": "open", "position": p})
+        for listener in self.listeners:
+            listener("open", p)
+        return p
+
+    def close(self, position_id):
+        p = self.apply_close(position_id)
+        if p is not None:
+            self.append({"op": "close", "id": position_id})
+            for listener in self.listeners:
+                listener("close", p)
+        return p
+
+    # --- Queries
+    def account_risk(self, account):
+        return self.by_account.get(account, 0.0)
+
+    def category_risk(self, category):
+        return self.by_category.get(category, 0.0)
+
+    def exchange_risk(self, exchange):
+        return self.by_exchange.get(exchange, 0.0)
+
+    def remaining_budget(self, account, budget):
+        # Dollar risk still available to account under budget (never negative)
+        return max(0.0, budget - self.account_risk(account))
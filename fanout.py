@@ -0,0 +1,120 @@
+"""Size one signal (symbol, stop) across every account in a registry.
+
+Usage:
+    python fanout.py accounts.csv ES 20
+    python fanout.py accounts.db NQ 35 --margin initial --out tcp://127.0.0.1:9100
+
+The registry is a CSV file or an SQLite database with an ``accounts`` table.
+Columns: account_id, balance, risk, risk_mode (percent/dollars) and the
+optional tier, funded and drawdown_headroom.
+"""
+import argparse
+import os
+import socket
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+import fpsc_core as fpsc
+
+BINDINGS = np.array(["risk", "margin", "rules", "headroom"])
+
+def load_accounts(path):
+    import pandas as pd
+    if os.path.splitext(path)[1].lower() in (".db", ".sqlite", ".sqlite3"):
+        with sqlite3.connect(path) as conn:
+            df = pd.read_sql_query("SELECT * FROM accounts", conn)
+    else:
+        df = pd.read_csv(path)
+    n = len(df)
+    return {
+        "account_id": df["account_id"].astype(str).to_numpy(),
+        "balance": pd.to_numeric(df["balance"], errors="coerce").fillna(0.0).to_numpy(np.float64),
+        "risk": pd.to_numeric(df["risk"], errors="coerce").fillna(0.0).to_numpy(np.float64),
+        "dollars": (df["risk_mode"].astype(str).str.lower() == "dollars").to_numpy() if "risk_mode" in df else np.zeros(n, dtype=bool),
+        "tier": pd.to_numeric(df["tier"], errors="coerce").fillna(0.0).to_numpy(np.float64) if "tier" in df else np.zeros(n),
+        "funded": df["funded"].astype(str).str.lower().isin(["1", "true", "yes", "pa"]).to_numpy() if "funded" in df else np.zeros(n, dtype=bool),
+        "headroom": pd.to_numeric(df["drawdown_headroom"], errors="coerce").fillna(np.inf).to_numpy(np.float64) if "drawdown_headroom" in df else np.full(n, np.inf),
+    }
+
+def fan_out(accounts, instrument, stop_ticks, margin_type="intraday"):
+    # One vectorized pass: min(risk, headroom) // per-contract risk, then margin and tier caps
+    balance = accounts["balance"]
+    risk_dollars = np.where(accounts["dollars"], accounts["risk"], balance * accounts["risk"] / 100.0)
+    capped_risk = np.minimum(risk_dollars, np.maximum(accounts["headroom"], 0.0))
+    dollar_risk_per_contract = stop_ticks * instrument["tick_value"]
+    if dollar_risk_per_contract <= 0:
+        raise ValueError("Stop and tick value must be positive.")
+
+    contracts = np.floor(capped_risk / dollar_risk_per_contract).astype(np.int64)
+    binding = np.where(capped_risk < risk_dollars, 3, 0)
+
+    margin = instrument.get(margin_type + "_margin", 0.0) if margin_type != "off" else 0.0
+    if margin > 0:
+        margin_contracts = np.floor(balance / margin).astype(np.int64)
+        binding = np.where(margin_contracts < contracts, 1, binding)
+        contracts = np.minimum(contracts, margin_contracts)
+
+    rules = fpsc.get_account_rules()
+    ratio = rules.micro_ratio_for(instrument["symbol"])
+    contracts, clamped = rules.clamp_bulk(accounts["tier"], contracts, ratio, accounts["funded"], balance)
+    binding = np.where(clamped, 2, binding)
+
+    contracts = np.maximum(contracts, 0)
+    return {
+        "account_id": accounts["account_id"],
+        "contracts": contracts,
+        "risk": contracts * dollar_risk_per_contract,
+        "binding": BINDINGS[binding],
+    }
+
+def format_rows(result):
+    lines = ["account_id,contracts,risk,binding"]
+    for account_id, contracts, risk, binding in zip(result["account_id"], result["contracts"].tolist(), result["risk"].tolist(), result["binding"]):
+        lines.append(f"{account_id},{contracts},{risk:.2f},{binding}")
+    return "\n".join(lines) + "\n"
+
+def stream_result(result, out):
+    payload = format_rows(result).encode()
+    if out == "-":
+        sys.stdout.buffer.write(payload)
+        sys.stdout.flush()
+    elif out.startswith("tcp://"):
+        host, port = out[len("tcp://"):].rsplit(":", 1)
+        with socket.create_connection((host, int(port))) as sock:
+            sock.sendall(payload)
+    else:
+        with open(out, "wb") as f:
+            f.write(payload)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Size one signal across an accounts registry.")
+    parser.add_argument("accounts", help="accounts CSV or SQLite database")
+    parser.add_argument("symbol")
+    parser.add_argument("stop", type=float, help="stop loss in ticks")
+    parser.add_argument("--margin", default="intraday", choices=["intraday", "initial", "maintenance", "off"])
+    parser.add_argument("--out", default="-", help="output file, '-' for stdout or tcp://host:port")
+    args = parser.parse_args(argv)
+    if not args.stop > 0:
+        parser.error(f"Stop must be a positive number of ticks: {args.stop:g}")
+
+    row = fpsc.find_row(args.symbol)
+    if row is None:
+        parser.error(f"Unknown symbol: {args.symbol}")
+    if not fpsc.instrument_valid(row):
+        parser.error(f"Invalid catalog row for {args.symbol}: " + "; ".join(fpsc.instrument_issues(row)))
+    instrument = fpsc.get_catalog()[0][row]
+    if not instrument["tick_value"] > 0:
+        parser.error(f"Tick value of {args.symbol} must be positive: {instrument['tick_value']:g}")
+    accounts = load_accounts(args.accounts)
+    start = time.perf_counter()
+    result = fan_out(accounts, instrument, args.stop, args.margin)
+    sized = time.perf_counter()
+    stream_result(result, args.out)
+    done = time.perf_counter()
+    print(f"{len(result['contracts'])} accounts sized in {(sized - start) * 1000:.2f} ms, streamed in {(done - sized) * 1000:.2f} ms", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""Catalog, sizing and config for the position size calculator.
+
+Stdlib-only at import time: pandas is imported only to parse a workbook,
+numpy only when the account rules are first needed, and the catalog is loaded
+on first use. The Tk GUI lives in fpsc_gui.py.
+"""
+import time
+# Wall-clock startup phases, written out when FPSC_STARTUP_REPORT is set (see benchmarks/startup.py)
+STARTUP_MARKS = {"module_start": time.time()}
+
+import csv
+import hashlib
+import os
+import json
+import sys
+
+from tracing import traced
+
+def resource_path(relative_path):
+    try:
+        base_path = sys._MEIPASS
+    except AttributeError:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+CONFIG_FILE = "fpsc_config.json"
+INSTRUMENT_FILE = resource_path("apex_tradable_instruments.xlsx")
+MARGIN_FILE = resource_path("apex_margin_requirements.csv")
+RULES_FILE = resource_path("apex_account_rules.json")
+ACCOUNT_SIZES = ["25,000", "50,000", "100,000", "150,000", "250,000", "300,000", "Custom"]
+MARGIN_TYPES = ["Intraday", "Initial", "Maintenance", "Off"]
+CATEGORIES = ("Equity Futures", "Currency Futures", "Agricultural Futures", "Energy Futures",
+              "Metal Futures", "Micro Futures", "Additional Instruments", "EUREX")
+RETURNS_DIR = "fpsc_returns"  # per-instrument price histories for VaR and correlations
+POSITIONS_FILE = "fpsc_positions.json"  # open positions snapshot, plus the event log below
+POSITIONS_LOG = "fpsc_positions.log"
+
+def live_file(relative_path):
+    # A file next to the frozen executable overrides the bundled copy
+    if getattr(sys, "frozen", False):
+        path = os.path.join(os.path.dirname(sys.executable), relative_path)
+        if os.path.exists(path):
+            return path
+    path = resource_path(relative_path)
+    return path if os.path.exists(path) else None
+
+def file_sha1(path):
+    if path is None:
+        return ""
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def load_margins(path=MARGIN_FILE):
+    # Optional: symbol -> (intraday, initial, maintenance) margin per contract
+    if path is None or not os.path.exists(path):
+        return {}
+    margins = {}
+    try:
+        with open(path, "r", newline="") as f:
+            for row in csv.DictReader(line for line in f if not line.startswith("#")):
+                values = []
+                for col in ("Intraday", "Initial", "Maintenance"):
+                    try:
+                        values.append(float(row[col]))
+                    except Exception:
+                        values.append(0.0)
+                margins[str(row["Symbol"]).strip().upper()] = values
+    except Exception:
+        return {}
+    return margins
+
+def apply_margins(instruments, margins):
+    # Margins are resolved once per row so sizing never has to look them up
+    for inst in instruments:
+        intraday, initial, maintenance = margins.get(str(inst["symbol"]).strip().upper(), (0.0, 0.0, 0.0))
+        inst["intraday_margin"] = intraday
+        inst["initial_margin"] = initial
+        inst["maintenance_margin"] = maintenance
+    return instruments
+
+def parse_catalog(path, margins):
+    """Return (instruments, validation) from the workbook.
+
+    validation is catalog_validation.validate()'s {"valid", "report"};
+    unparseable numbers become 0.0 in the instruments and are reported there.
+    """
+    import pandas as pd
+    from catalog_validation import validate_frame
+    df = pd.read_excel(path)
+    validation = validate_frame(df)
+    n = len(df)
+    column = lambda name, default: df[name].tolist() if name in df else [default] * n
+    numbers = lambda name: pd.to_numeric(df[name], errors="coerce").fillna(0.0).astype(float).tolist()
+    instruments = [
+        {"category": category, "name": name, "symbol": symbol, "exchange": exchange, "tick_size": tick_size, "tick_value": tick_value}
+        for category, name, symbol, exchange, tick_size, tick_value in zip(
+            column("Category", "Other"), df["Name"].tolist(), df["Symbol"].tolist(), column("Exchange", ""),
+            numbers("Tick Size"), numbers("Point Value"))
+    ]
+    return apply_margins(instruments, margins), validation
+
+def parse_instruments(path, margins):
+    return parse_catalog(path, margins)[0]
+
+def build_search_index(instruments):
+    # Lowercased "name\0symbol" per row plus symbol and category lookups
+    text = [f"{inst['name']}\0{inst['symbol']}".lower() for inst in instruments]
+    symbols = {}
+    categories = {}
+    for i, inst in enumerate(instruments):
+        symbols.setdefault(str(inst["symbol"]).upper(), i)
+        categories.setdefault(inst["category"], []).append(i)
+    return {"text": text, "symbols": symbols, "categories": categories}
+
+def load_compiled_catalog():
+    try:
+        import catalog_data
+    except ImportError:
+        return None
+    return catalog_data
+
+def catalog_from_module(catalog):
+    instruments = [dict(zip(catalog.COLUMNS, row)) for row in zip(*(getattr(catalog, col.upper()) for col in catalog.COLUMNS))]
+    index = {"text": list(catalog.SEARCH_TEXT), "symbols": dict(catalog.SYMBOL_INDEX),
+             "categories": {k: list(v) for k, v in catalog.CATEGORY_INDEX.items()},
+             "valid": getattr(catalog, "VALID", None), "report": getattr(catalog, "REPORT", None)}
+    return instruments, index
+
+@traced()
+def load_catalog():
+    """Return (instruments, search index).
+
+    Uses the module generated by build_catalog.py when the workbook next to the
+    app is missing or unchanged since the build, so frozen builds never parse
+    Excel. An edited workbook or margin file is parsed live instead.
+    """
+    workbook = live_file(os.path.basename(INSTRUMENT_FILE))
+    margin_file = live_file(os.path.basename(MARGIN_FILE))
+    catalog = load_compiled_catalog()
+    if catalog is not None and (workbook is None or file_sha1(workbook) == catalog.SOURCE_SHA1):
+        instruments, index = catalog_from_module(catalog)
+        if margin_file is not None and file_sha1(margin_file) != catalog.MARGIN_SHA1:
+            apply_margins(instruments, load_margins(margin_file))
+        return instruments, index
+    if workbook is None:
+        return [], build_search_index([])
+    instruments, validation = parse_catalog(workbook, load_margins(margin_file))
+    index = build_search_index(instruments)
+    index.update(validation)
+    return instruments, index
+
+@traced()
+def load_instruments():
+    return load_catalog()[0]
+
+_CATALOG = None
+_ACCOUNT_RULES = None
+# Non-empty searches that matched at least one row (hits) or none (misses), for the perf panel
+SEARCH_STATS = {"hits": 0, "misses": 0}
+
+def get_catalog():
+    # (instruments, search index), loaded on first use
+    global _CATALOG
+    if _CATALOG is None:
+        _CATALOG = load_catalog()
+        STARTUP_MARKS.setdefault("load_instruments", time.time())
+    return _CATALOG
+
+def set_catalog(instruments, index=None):
+    # Swap in another catalog (benchmarks, batch tools)
+    global _CATALOG
+    _CATALOG = (instruments, index if index is not None else build_search_index(instruments))
+
+def get_account_rules():
+    global _ACCOUNT_RULES
+    if _ACCOUNT_RULES is None:
+        from account_rules import AccountRules, load_account_rules
+        _ACCOUNT_RULES = AccountRules(load_account_rules(RULES_FILE))
+    return _ACCOUNT_RULES
+
+def __getattr__(name):
+    # Keep INSTRUMENTS / SEARCH_INDEX / ACCOUNT_RULES usable as module attributes
+    if name == "INSTRUMENTS":
+        return get_catalog()[0]
+    if name == "SEARCH_INDEX":
+        return get_catalog()[1]
+    if name == "ACCOUNT_RULES":
+        return get_account_rules()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def find_row(symbol):
+    return get_catalog()[1]["symbols"].get(str(symbol).strip().upper())
+
+def find_instrument(symbol):
+    i = find_row(symbol)
+    return get_catalog()[0][i] if i is not None else None
+
+def instrument_valid(i):
+    # Bit i of the validation bitmap; catalogs without one (set_catalog, older builds) count as valid
+    valid = get_catalog()[1].get("valid")
+    return valid is None or bool(valid[i >> 3] >> (7 - (i & 7)) & 1)
+
+def instrument_issues(i):
+    # Validation messages for catalog row i (errors and warnings)
+    report = get_catalog()[1].get("report") or {}
+    return [issue["message"] for issue in report.get("issues", ()) if issue["row"] == i]
+
+def catalog_report():
+    return get_catalog()[1].get("report")
+
+@traced()
+def filter_indices(query, category=None):
+    # Catalog positions matching the search; the returned sequence is shared, don't modify it
+    instruments, index = get_catalog()
+    query = query.strip().lower()
+    category = category if category and category != "All" else None
+    candidates = index["categories"].get(category, []) if category else range(len(instruments))
+    if not query:
+        return candidates
+    text = index["text"]
+    candidates = [i for i in candidates if query in text[i]]
+    SEARCH_STATS["hits" if candidates else "misses"] += 1
+    return candidates
+
+@traced()
+def filter_instruments(query, category=None):
+    instruments = get_catalog()[0]
+    return [instruments[i] for i in filter_indices(query, category)]
+
+def catalog_footprint():
+    # Approximate bytes held by the catalog and its search index (shared objects counted once)
+    seen = set()
+    def size(obj):
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        total = sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            total += sum(size(k) + size(v) for k, v in obj.items())
+        elif isinstance(obj, (list, tuple, set)):
+            total += sum(size(v) for v in obj)
+        return total
+    return size(get_catalog())
+
+def size_contracts(risk_dollars, dollar_risk_per_contract, account_size=0.0, margin_per_contract=0.0, max_contracts=None, risk_budget=None):
+    # Returns (contracts, binding constraint): the smallest of the risk, open-risk budget, margin and account-rule limits
+    contracts = int(risk_dollars // dollar_risk_per_contract) if dollar_risk_per_contract > 0 else 0
+    binding = "risk"
+    if risk_budget is not None and dollar_risk_per_contract > 0:
+        budget_contracts = int(max(risk_budget, 0.0) // dollar_risk_per_contract)
+        if budget_contracts < contracts:
+            contracts, binding = budget_contracts, "budget"
+    if margin_per_contract > 0 and account_size > 0:
+        margin_contracts = int(account_size // margin_per_contract)
+        if margin_contracts < contracts:
+            contracts, binding = margin_contracts, "margin"
+    if max_contracts is not None and max_contracts < contracts:
+        contracts, binding = max_contracts, "rules"
+    return contracts, binding
+
+def write_startup_report():
+    path = os.environ.get("FPSC_STARTUP_REPORT")
+    if not path:
+        return
+    try:
+        with open(path, "w") as f:
+            json.dump({"frozen": bool(getattr(sys, "frozen", False)), "marks": STARTUP_MARKS}, f)
+    except Exception:
+        pass
+
+@traced()
+def save_config(data):
+    try:
+        with open(CONFIG_FILE, "w") as f:
+            json.dump(data, f)
+    except Exception:
+        pass
+
+@traced()
+def load_config():
+    if os.path.exists(CONFIG_FILE):
+        try:
+            with open(CONFIG_FILE, "r") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    return {}
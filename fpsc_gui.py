@@ -0,0 +1,921 @@
+import tkinter as tk
+from tkinter import ttk
+import math
+import os
+import time
+
+import tracing
+from tracing import traced
+
+from fpsc_core import (
+    ACCOUNT_SIZES, MARGIN_TYPES, POSITIONS_FILE, POSITIONS_LOG, RETURNS_DIR, STARTUP_MARKS, filter_indices, get_account_rules, get_catalog,
+    instrument_issues, instrument_valid, load_config, save_config, size_contracts, write_startup_report,
+)
+from instrument_picker import VirtualPicker
+from journal import Journal
+from profiles import ProfileStore
+
+JOURNAL_DELAY_MS = 1500
+CONFIG_SAVE_DELAY_MS = 500
+KELLY_SCALE = 0.5  # suggested risk is half of optimal f; full Kelly sizing is very volatile
+FRAME_MS = 16  # quote polling interval: at most one recalculation per frame
+OTHER_ROW = -1  # picker key for "Other (Manual Input)"
+
+class FPSCApp(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.title("Futures Position Size Calculator")
+        self.resizable(False, False)
+        self.config(padx=16, pady=16)
+
+        self.config_data = load_config()
+        self.journal = Journal()
+        self.profiles = ProfileStore()
+        self.journal_after = None
+        self.last_result = None
+        self.last_journaled = None
+        self.config_after = None
+        self.pending_config_writes = 0
+        self.perf_overlay = None
+        self.command_palette = None
+        self.quote_source = None
+        self.quote_cache = None
+        self.volatility = None
+        self.atr_k = 1.5
+        self.var_model = None
+        self.ledger = None
+        self.portfolio_model = None
+        self.positions_window = None
+        self.loss_tracker = None
+        self.loss_source = None
+        self.loss_pending = False
+        self.budget_kind = None
+        self.instrument_issue = None  # validation message of the selected catalog row
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # --- Variables
+        self.account_var = tk.StringVar()
+        self.funded_var = tk.BooleanVar(value=False)
+        self.risk_var = tk.StringVar()
+        self.stop_var = tk.StringVar()
+        self.contract_type_var = tk.StringVar()
+        self.instrument_search_var = tk.StringVar()
+        self.instrument_var = tk.StringVar()
+        self.tick_size_var = tk.StringVar()
+        self.tick_value_var = tk.StringVar()
+        self.contracts_var = tk.StringVar()
+        self.risk_mode = tk.StringVar(value="percent")
+        self.margin_type_var = tk.StringVar(value="Intraday")
+        self.stop_mode = tk.StringVar(value="ticks")
+        self.stop_price_var = tk.StringVar()
+        self.quote_var = tk.StringVar(value="")
+        self.selected_instrument = None
+        self.is_updating = False
+        self.error_var = tk.StringVar(value="")
+        self.result_var = tk.StringVar(value="Contracts to Trade: -")
+        self.binding_var = tk.StringVar(value="")
+        self.profile_var = tk.StringVar(value="")
+        self.positions_var = tk.StringVar(value="")
+        self.active_field = None
+
+        # --- UI
+        STARTUP_MARKS["app_init"] = time.time()
+        self.create_widgets()
+        STARTUP_MARKS["create_widgets"] = time.time()
+        self.update_instrument_dropdown()
+        self.account_size_selected()
+        self.load_last_used()
+        if os.path.exists(POSITIONS_FILE) or os.path.exists(POSITIONS_LOG):
+            self.after_idle(self.show_positions)
+        self.bind("<Map>", self.on_first_map, add="+")
+        self.bind_all("<Control-Shift-T>", self.toggle_trace)
+        self.bind_all("<Control-Shift-t>", self.toggle_trace)
+        self.bind_all("<F12>", self.toggle_perf_overlay)
+        for sequence in ("<Control-k>", "<Control-K>"):
+            # The Entry class binding would otherwise delete to end of line first
+            self.bind_class("Entry", sequence, self.open_command_palette)
+            self.bind_all(sequence, self.open_command_palette)
+
+    def create_widgets(self):
+        # Account Size
+        tk.Label(self, text="Account Size ($):").grid(row=0, column=0, sticky='e')
+        self.account_combo = ttk.Combobox(self, values=ACCOUNT_SIZES, state='readonly', width=10)
+        self.account_combo.grid(row=0, column=1, sticky='w')
+        self.account_combo.bind("<<ComboboxSelected>>", self.account_size_selected)
+        self.account_entry = tk.Entry(self, textvariable=self.account_var, width=12)
+        self.account_entry.grid(row=0, column=2, sticky='w')
+        ttk.Checkbutton(self, text="Funded", variable=self.funded_var, command=self.account_size_selected).grid(row=0, column=3, sticky='w')
+
+        # Risk per Trade
+        tk.Label(self, text="Risk per Trade:").grid(row=1, column=0, sticky='e')
+        risk_frame = tk.Frame(self)
+        risk_frame.grid(row=1, column=1, columnspan=3, sticky='w')
+        self.risk_entry = tk.Entry(risk_frame, textvariable=self.risk_var, width=12)
+        self.risk_entry.pack(side="left")
+        self.percent_btn = ttk.Radiobutton(risk_frame, text="Percent", variable=self.risk_mode, value="percent", command=self.on_risk_mode_change)
+        self.percent_btn.pack(side="left", padx=(6,0))
+        self.dollars_btn = ttk.Radiobutton(risk_frame, text="Dollars", variable=self.risk_mode, value="dollars", command=self.on_risk_mode_change)
+        self.dollars_btn.pack(side="left", padx=(6,0))
+        self.risk_unit_label = tk.Label(risk_frame, text="%")
+        self.risk_unit_label.pack(side="left", padx=(6,0))
+        ttk.Button(risk_frame, text="Kelly...", command=self.suggest_kelly_risk).pack(side="left", padx=(6,0))
+
+        # Contracts to Trade
+        tk.Label(self, text="Contracts to Trade:").grid(row=2, column=0, sticky='e')
+        self.contracts_entry = tk.Entry(self, textvariable=self.contracts_var, width=12)
+        self.contracts_entry.grid(row=2, column=1, sticky='w')
+
+        # Minimum Risk Label
+        self.min_risk_label = tk.Label(self, text="Min risk to trade with current stop loss: -", fg="grey")
+        self.min_risk_label.grid(row=3, column=1, columnspan=3, sticky='w')
+
+        # Total risk for N contracts
+        self.total_risk_label = tk.Label(self, text="Total risk for X contracts: -", fg="grey")
+        self.total_risk_label.grid(row=4, column=1, columnspan=3, sticky='w')
+
+        # Stop Loss
+        tk.Label(self, text="Stop Loss (Ticks):").grid(row=5, column=0, sticky='e')
+        self.stop_entry = tk.Entry(self, textvariable=self.stop_var, width=12)
+        self.stop_entry.grid(row=5, column=1, sticky='w')
+        # Price mode: ticks are derived from the stop price and the latest quote
+        stop_frame = tk.Frame(self)
+        stop_frame.grid(row=5, column=2, columnspan=2, sticky='w')
+        ttk.Radiobutton(stop_frame, text="Ticks", variable=self.stop_mode, value="ticks", command=self.on_stop_mode_change).pack(side="left")
+        ttk.Radiobutton(stop_frame, text="Price", variable=self.stop_mode, value="price", command=self.on_stop_mode_change).pack(side="left", padx=(6, 0))
+        self.stop_price_entry = tk.Entry(stop_frame, textvariable=self.stop_price_var, width=10, state="disabled")
+        self.stop_price_entry.pack(side="left", padx=(6, 0))
+        tk.Label(stop_frame, textvariable=self.quote_var, fg="grey").pack(side="left", padx=(6, 0))
+        ttk.Button(stop_frame, text="ATR", width=4, command=self.suggest_stop).pack(side="left", padx=(6, 0))
+
+        # Contract Type
+        tk.Label(self, text="Contract Type:").grid(row=6, column=0, sticky='e')
+        self.contract_types = sorted(list({inst["category"] for inst in get_catalog()[0]}))
+        self.contract_combo = ttk.Combobox(self, values=self.contract_types + ["All"], textvariable=self.contract_type_var, state='readonly', width=12)
+        self.contract_combo.grid(row=6, column=1, sticky='w')
+        self.contract_combo.set("All")
+        self.contract_combo.bind("<<ComboboxSelected>>", self.update_instrument_dropdown)
+
+        # Instrument search and dropdown
+        tk.Label(self, text="Instrument:").grid(row=7, column=0, sticky='e')
+        self.instrument_search_var.trace_add('write', self.update_instrument_dropdown)
+        self.instrument_search = tk.Entry(self, textvariable=self.instrument_search_var, width=18)
+        self.instrument_search.grid(row=7, column=1, sticky='w')
+
+        # Only the visible rows are rendered, so huge result sets stay cheap
+        self.instrument_picker = VirtualPicker(self, self.instrument_label, height=6, width=32)
+        self.instrument_picker.grid(row=7, column=2, columnspan=2, sticky='w')
+        self.instrument_picker.bind("<<PickerSelected>>", self.instrument_selected)
+
+        # Tick Size/Value -- now ALWAYS editable
+        tk.Label(self, text="Tick Size:").grid(row=8, column=0, sticky='e')
+        self.tick_size_entry = tk.Entry(self, textvariable=self.tick_size_var, width=12)
+        self.tick_size_entry.grid(row=8, column=1, sticky='w')
+        tk.Label(self, text="Tick Value:").grid(row=8, column=2, sticky='e')
+        self.tick_value_entry = tk.Entry(self, textvariable=self.tick_value_var, width=12)
+        self.tick_value_entry.grid(row=8, column=3, sticky='w')
+
+        # Margin used for the buying power constraint
+        tk.Label(self, text="Margin:").grid(row=9, column=0, sticky='e')
+        self.margin_combo = ttk.Combobox(self, values=MARGIN_TYPES, textvariable=self.margin_type_var, state='readonly', width=12)
+        self.margin_combo.grid(row=9, column=1, sticky='w')
+
+        # Result
+        self.result_label = tk.Label(self, textvariable=self.result_var, font=("Arial", 18, "bold"))
+        self.result_label.grid(row=10, column=0, columnspan=4, pady=(10, 0))
+
+        # Binding constraint (risk, margin or account rules)
+        self.binding_label = tk.Label(self, textvariable=self.binding_var, fg="grey")
+        self.binding_label.grid(row=11, column=0, columnspan=4)
+
+        # Copy to clipboard
+        self.copy_btn = ttk.Button(self, text="Copy Result", command=self.copy_result)
+        self.copy_btn.grid(row=12, column=0, columnspan=4, pady=(4, 0))
+
+        # Error message
+        self.error_label = tk.Label(self, textvariable=self.error_var, fg="red")
+        self.error_label.grid(row=13, column=0, columnspan=4)
+
+        # Profiles
+        tk.Label(self, text="Profile:").grid(row=14, column=0, sticky='e')
+        self.profile_combo = ttk.Combobox(self, textvariable=self.profile_var, width=18, postcommand=self.refresh_profile_names)
+        self.profile_combo.grid(row=14, column=1, sticky='w')
+        self.profile_combo.bind("<<ComboboxSelected>>", self.profile_selected)
+        profile_frame = tk.Frame(self)
+        profile_frame.grid(row=14, column=2, columnspan=2, sticky='w')
+        ttk.Button(profile_frame, text="Save", command=self.save_profile).pack(side="left")
+        ttk.Button(profile_frame, text="Delete", command=self.delete_profile).pack(side="left", padx=(6, 0))
+
+        # Open positions (correlation-aware total risk)
+        tk.Label(self, text="Positions:").grid(row=15, column=0, sticky='e')
+        positions_frame = tk.Frame(self)
+        positions_frame.grid(row=15, column=1, columnspan=3, sticky='w')
+        ttk.Button(positions_frame, text="Add Position", command=self.add_position).pack(side="left")
+        ttk.Button(positions_frame, text="List...", command=self.open_positions_window).pack(side="left", padx=(6, 0))
+        ttk.Button(positions_frame, text="Stress...", command=self.stress_positions).pack(side="left", padx=(6, 0))
+        tk.Label(positions_frame, textvariable=self.positions_var, fg="grey").pack(side="left", padx=(6, 0))
+
+        # Bindings for one-way input logic
+        self.risk_entry.bind("<FocusIn>", self.on_risk_focus_in)
+        self.risk_entry.bind("<FocusOut>", self.on_focus_out)
+        self.contracts_entry.bind("<FocusIn>", self.on_contracts_focus_in)
+        self.contracts_entry.bind("<FocusOut>", self.on_focus_out)
+
+        # Variable traces
+        self.account_var.trace_add('write', lambda *a, **kw: self.calculate())
+        self.risk_var.trace_add('write', lambda *a, **kw: self.one_way_risk_edited())
+        self.contracts_var.trace_add('write', lambda *a, **kw: self.one_way_contracts_edited())
+        self.stop_var.trace_add('write', lambda *a, **kw: self.calculate())
+        self.contract_type_var.trace_add('write', lambda *a, **kw: self.calculate())
+        self.instrument_var.trace_add('write', lambda *a, **kw: self.calculate())
+        self.tick_size_var.trace_add('write', lambda *a, **kw: self.calculate())
+        self.tick_value_var.trace_add('write', lambda *a, **kw: self.calculate())
+        self.margin_type_var.trace_add('write', lambda *a, **kw: self.calculate())
+        self.stop_price_var.trace_add('write', lambda *a, **kw: self.update_price_stop())
+        self.risk_mode.trace_add('write', self.on_risk_mode_change)
+        self.account_combo.bind("<<ComboboxSelected>>", lambda e: self.calculate())
+        self.contract_combo.bind("<<ComboboxSelected>>", lambda e: self.calculate())
+
+    def toggle_trace(self, event=None):
+        # First press starts tracing, the next one saves the spans as Chrome trace JSON
+        if not tracing.is_enabled():
+            tracing.enable()
+            self.error_var.set("Tracing on - press Ctrl+Shift+T again to save.")
+            return
+        path = os.path.abspath(time.strftime("fpsc_trace_%Y%m%d_%H%M%S.json"))
+        count = tracing.dump_chrome_trace(path)
+        tracing.disable()
+        self.error_var.set(f"Saved {count} spans to {os.path.basename(path)}")
+    def toggle_perf_overlay(self, event=None):
+        if self.perf_overlay is not None:
+            self.perf_overlay.close()
+            return
+        from perf_overlay import PerfOverlay
+        self.perf_overlay = PerfOverlay(self)
+    def open_command_palette(self, event=None):
+        if self.command_palette is None:
+            from command_palette import CommandPalette
+            self.command_palette = CommandPalette(self)
+        self.command_palette.entry.focus_set()
+        return "break"
+    @traced()
+    def apply_command(self, command, position=None):
+        # Palette result: position is a catalog index (None keeps the current instrument)
+        if "risk_mode" in command and command["risk_mode"] != self.risk_mode.get():
+            self.risk_mode.set(command["risk_mode"])  # clears risk and contracts
+        if position is not None:
+            self.select_catalog_instrument(position)
+        if "stop" in command:
+            self.stop_var.set(f"{command['stop']:g}")
+        if "risk" in command:
+            self.active_field = "risk"
+            self.risk_var.set(f"{command['risk']:g}")
+        elif "contracts" in command:
+            self.active_field = "contracts"
+            self.contracts_var.set(str(command["contracts"]))
+        self.active_field = None
+    def select_catalog_instrument(self, i):
+        inst = get_catalog()[0][i]
+        if self.contract_type_var.get() not in ("All", inst["category"]):
+            self.contract_combo.set("All")
+        # Searching for the symbol itself keeps the picker short and always contains it
+        self.instrument_search_var.set(inst["symbol"].lower())
+        self.instrument_picker.select(self.instrument_picker.rows.index(i))
+    def on_first_map(self, event):
+        if event.widget is not self or "first_window" in STARTUP_MARKS:
+            return
+        STARTUP_MARKS["first_window"] = time.time()
+        self.after_idle(self.on_interactive)
+    def on_interactive(self):
+        STARTUP_MARKS["interactive"] = time.time()
+        write_startup_report()
+        if os.environ.get("FPSC_STARTUP_EXIT"):
+            self.after(0, self.on_close)
+    def on_risk_focus_in(self, event):
+        self.active_field = "risk"
+    def on_contracts_focus_in(self, event):
+        self.active_field = "contracts"
+    def on_focus_out(self, event):
+        self.active_field = None
+    @traced()
+    def on_risk_mode_change(self, *args):
+        if self.risk_mode.get() == "percent":
+            self.risk_unit_label.config(text="%")
+        else:
+            self.risk_unit_label.config(text="$")
+        self.risk_var.set("")
+        self.contracts_var.set("")
+        self.calculate()
+    def on_stop_mode_change(self, *args):
+        price_mode = self.stop_mode.get() == "price"
+        self.stop_entry.config(state="readonly" if price_mode else "normal")
+        self.stop_price_entry.config(state="normal" if price_mode else "disabled")
+        if price_mode:
+            self.update_price_stop()
+        else:
+            self.quote_var.set("")
+    def update_price_stop(self):
+        # Stop distance in ticks from the latest quote: longs enter at the ask, shorts at the bid
+        if self.stop_mode.get() != "price":
+            return
+        inst = self.selected_instrument
+        quote = self.quote_cache.get(inst["symbol"]) if self.quote_cache and inst else None
+        if quote is None:
+            self.quote_var.set("no quote")
+            return
+        _, bid, ask = quote
+        self.quote_var.set(f"{bid:g} / {ask:g}")
+        try:
+            stop_price = float(self.stop_price_var.get())
+            tick_size = float(self.tick_size_var.get())
+        except ValueError:
+            return
+        if tick_size <= 0:
+            return
+        entry = ask if stop_price < (bid + ask) / 2 else bid
+        ticks = str(math.ceil(abs(entry - stop_price) / tick_size - 1e-9))
+        if ticks != self.stop_var.get():
+            self.stop_var.set(ticks)
+    def attach_quotes(self, source):
+        from quotes import QuoteCache
+        self.quote_cache = QuoteCache()
+        if self.volatility is not None:
+            self.quote_cache.listeners.append(self.volatility.update_quote)
+        self.quote_source = source
+        source.start(self.quote_cache)
+        self.after(FRAME_MS, self.poll_quotes)
+    def suggest_kelly_risk(self):
+        # Risk percent from a trade history: KELLY_SCALE x optimal f (per 1R)
+        from tkinter import filedialog
+        path = filedialog.askopenfilename(parent=self, title="Trade history", filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        import kelly
+        try:
+            result = kelly.analyze_file(path)
+        except Exception as e:
+            self.error_var.set(f"Could not read trade history: {e}")
+            return
+        risk = round(result["optimal_f_risk_pct"] * KELLY_SCALE, 2)
+        if risk <= 0:
+            self.error_var.set(f"No edge in {result['trades']} trades (mean {result['mean_r']:.2f}R); risk left unchanged.")
+            return
+        if self.risk_mode.get() != "percent":
+            self.risk_mode.set("percent")
+        self.active_field = "risk"
+        self.risk_var.set(str(risk))
+        self.active_field = None
+        self.error_var.set(f"{KELLY_SCALE:g} x optimal f over {result['trades']} trades (Kelly {result['kelly_risk_pct']:.2f}%, optimal f {result['optimal_f_risk_pct']:.2f}%)")
+    def attach_volatility(self, engine, k=1.5):
+        # Attach before attach_quotes so the engine also sees the quote feed
+        self.volatility = engine
+        self.atr_k = k
+    def suggest_stop(self):
+        # Fill the stop with k x ATR in ticks
+        inst = self.selected_instrument
+        if self.volatility is None or inst is None:
+            self.error_var.set("ATR stops need bar history (--ohlc) or a quote feed (--replay).")
+            return
+        try:
+            tick_size = float(self.tick_size_var.get())
+        except ValueError:
+            tick_size = 0.0
+        ticks = self.volatility.suggest_stop(inst["symbol"], tick_size, self.atr_k)
+        if ticks is None:
+            self.error_var.set(f"No volatility history for {inst['symbol']} yet.")
+            return
+        if self.stop_mode.get() != "ticks":
+            self.stop_mode.set("ticks")
+            self.on_stop_mode_change()
+        self.stop_var.set(str(ticks))
+    def poll_quotes(self):
+        # Quotes arrive on the feed thread; only the selected symbol triggers work, once per frame
+        changed = self.quote_cache.drain_changed()
+        if self.selected_instrument is not None and self.selected_instrument["symbol"] in changed:
+            self.update_price_stop()
+        self.after(FRAME_MS, self.poll_quotes)
+    def highlight_entry(self, entry_widget, is_error):
+        try:
+            entry_widget.config(bg="#ffd4d4" if is_error else "white")
+        except Exception:
+            pass
+    @traced()
+    def account_size_selected(self, event=None):
+        selected = self.account_combo.get().replace(",", "")
+        if selected.lower() == "custom":
+            self.account_entry.config(state="normal")
+            self.account_var.set("")
+        elif self.funded_var.get():
+            # Funded accounts size from the current balance; the tier stays the preset
+            self.account_entry.config(state="normal")
+            self.account_var.set(selected)
+        else:
+            self.account_entry.config(state="readonly")
+            self.account_var.set(selected)
+    @traced()
+    def update_instrument_dropdown(self, *args):
+        query = self.instrument_search_var.get().strip().lower()
+        category = self.contract_type_var.get()
+        rows = list(filter_indices(query, category))
+        rows.append(OTHER_ROW)
+        self.instrument_picker.set_rows(rows)
+        self.instrument_selected()
+    def instrument_label(self, key):
+        if key == OTHER_ROW:
+            return "Other (Manual Input)"
+        inst = get_catalog()[0][key]
+        return f"{inst['name']} ({inst['symbol']})"
+    @traced()
+    def instrument_selected(self, event=None):
+        idx = self.instrument_picker.current()
+        if idx >= 0:
+            key = self.instrument_picker.rows[idx]
+            self.instrument_var.set(self.instrument_picker.get())
+            # Only fill if it's not "Other"
+            if key != OTHER_ROW:
+                inst = get_catalog()[0][key]
+                self.selected_instrument = inst
+                self.instrument_issue = None
+                if not instrument_valid(key):
+                    self.instrument_issue = f"Catalog row for {inst['symbol']} is invalid: " + "; ".join(instrument_issues(key))
+                self.tick_size_var.set(str(inst.get("tick_size", "")))
+                self.tick_value_var.set(str(inst.get("tick_value", "")))
+            else:
+                self.selected_instrument = None
+                self.instrument_issue = None
+                self.tick_size_var.set("")
+                self.tick_value_var.set("")
+        self.update_price_stop()
+        self.calculate()
+    def margin_per_contract(self):
+        inst = self.selected_instrument
+        margin_type = self.margin_type_var.get()
+        if inst is None or margin_type == "Off":
+            return 0.0
+        return inst.get(margin_type.lower() + "_margin", 0.0)
+    def rules_max_contracts(self):
+        # Apex tier cap for the selected instrument (micros scaled by the micro ratio)
+        tier = self.account_combo.get().replace(",", "")
+        if not tier or tier.lower() == "custom":
+            return None
+        symbol = self.selected_instrument["symbol"] if self.selected_instrument else ""
+        try:
+            balance = float(self.account_var.get().replace(",", "") or "0")
+        except ValueError:
+            balance = None
+        return get_account_rules().max_for(tier, symbol, self.funded_var.get(), balance)
+    def show_binding(self, binding, contracts, account_size, margin, rules_cap, budget=None):
+        max_margin_contracts = int(account_size // margin) if margin > 0 else None
+        limits = [c for c in (max_margin_contracts, rules_cap) if c is not None]
+        if binding == "budget" and self.budget_kind == "daily":
+            self.binding_var.set(f"Limited by daily loss limit: ${budget:,.0f} left today after open positions")
+            self.binding_label.config(fg="orange")
+        elif binding == "budget":
+            self.binding_var.set(f"Limited by open-risk budget: ${budget:,.0f} left after open positions")
+            self.binding_label.config(fg="orange")
+        elif binding == "margin":
+            self.binding_var.set(f"Limited by margin: max {max_margin_contracts} at ${margin:,.0f}/contract")
+            self.binding_label.config(fg="orange")
+        elif binding == "rules":
+            self.binding_var.set(f"Limited by account rules: max {rules_cap} contracts")
+            self.binding_label.config(fg="orange")
+        elif limits and contracts > min(limits):
+            self.binding_var.set(f"Exceeds limits: max {min(limits)} contracts")
+            self.binding_label.config(fg="red")
+        elif limits:
+            self.binding_var.set(f"Limited by risk (max allowed {min(limits)})")
+            self.binding_label.config(fg="grey")
+    @traced()
+    def var_suffix(self, contracts, point_value):
+        # Historical VaR/CVaR next to the stop-based risk, for instruments with a file in RETURNS_DIR
+        # (the tick value field holds the catalog's point value, dollars per point)
+        inst = self.selected_instrument
+        if inst is None or contracts <= 0 or point_value <= 0:
+            return ""
+        try:
+            if self.var_model is None:
+                if not os.path.isdir(RETURNS_DIR):
+                    return ""
+                from var_model import HistoricalVaR
+                self.var_model = HistoricalVaR()
+            risk = self.var_model.position_risk(inst["symbol"], contracts, point_value)
+        except Exception:
+            return ""
+        if risk is None:
+            return ""
+        var, cvar, _ = risk
+        return f"  |  VaR 99%: ${var:,.2f}  CVaR: ${cvar:,.2f}"
+    def portfolio_suffix(self, total_risk):
+        # Correlated total if this trade joined the open positions
+        inst = self.selected_instrument
+        if self.ledger is None or not self.ledger.positions or inst is None or total_risk <= 0:
+            return ""
+        try:
+            from exposure import position_side
+            side = position_side(self.quote_mid(inst["symbol"]), self.stop_price())
+            combined = self.portfolio_model.risk_with(inst["symbol"], side * total_risk)
+        except Exception:
+            return ""
+        return f"  |  With open positions: ${combined:,.2f}"
+    def account_key(self):
+        # Name positions and journal rows are filed under
+        return self.profile_var.get() or self.account_combo.get() or self.account_var.get()
+    def remaining_risk_budget(self):
+        # Smaller of the tier drawdown and today's loss allowance, less the stop risk already open (None if neither applies)
+        self.budget_kind = None
+        if self.ledger is None and self.loss_tracker is None:
+            return None
+        account = self.account_key()
+        tier = self.account_combo.get().replace(",", "")
+        if tier.lower() == "custom":
+            tier = ""
+        budgets = []
+        drawdown = get_account_rules().drawdown_for(tier) if tier else None
+        if self.ledger is not None and drawdown:
+            budgets.append((self.ledger.remaining_budget(account, drawdown), "open"))
+        if self.loss_tracker is not None:
+            daily = get_account_rules().daily_loss_for(tier) if tier else None
+            left = self.loss_tracker.remaining(account, daily)
+            if left is not None:
+                open_risk = self.ledger.account_risk(account) if self.ledger is not None else 0.0
+                budgets.append((max(0.0, left - open_risk), "daily"))
+        if not budgets:
+            return None
+        budget, self.budget_kind = min(budgets)
+        return budget
+    def attach_loss_tracker(self, tracker, source):
+        # Budget changes arrive on the feed thread and are handed to the Tk loop as one virtual event
+        self.loss_tracker = tracker
+        self.loss_source = source
+        self.bind("<<LossBudget>>", self.on_loss_budget)
+        tracker.subscribe(self.on_loss_event)
+        source.start(tracker)
+    def on_loss_event(self, account, day_pnl, remaining):
+        if not self.loss_pending:
+            self.loss_pending = True
+            try:
+                self.event_generate("<<LossBudget>>", when="tail")
+            except Exception:
+                self.loss_pending = False  # not posted (e.g. before mainloop); let the next event try again
+    def on_loss_budget(self, event=None):
+        self.loss_pending = False
+        self.calculate()
+    def position_ledger(self):
+        if self.ledger is None:
+            from exposure import ExposureLedger
+            from portfolio import PortfolioRisk
+            self.ledger = ExposureLedger()
+            self.portfolio_model = PortfolioRisk()
+            self.portfolio_model.follow(self.ledger)
+        return self.ledger
+    def show_positions(self):
+        ledger = self.position_ledger()
+        model = self.portfolio_model
+        if ledger.positions:
+            self.positions_var.set(f"{len(ledger.positions)} open, risk ${model.risk():,.2f} (${model.linear_risk():,.2f} if summed)")
+        else:
+            self.positions_var.set("")
+        self.calculate()
+    def add_position(self):
+        result = self.last_result
+        if result is None:
+            self.error_var.set("Calculate a position first.")
+            return
+        inst = self.selected_instrument or {}
+        self.position_ledger().open(result["account"], result["symbol"], result["contracts"], result["risk_dollars"],
+                                    self.quote_mid(result["symbol"]), self.stop_price(), inst.get("category", ""), inst.get("exchange", ""))
+        self.show_positions()
+        if self.positions_window is not None:
+            self.positions_window.refresh()
+    def quote_mid(self, symbol):
+        quote = self.quote_cache.get(symbol) if self.quote_cache else None
+        return (quote[1] + quote[2]) / 2 if quote else None
+    def stop_price(self):
+        # Stop as a price when the stop is entered that way, else None
+        if self.stop_mode.get() != "price":
+            return None
+        try:
+            return float(self.stop_price_var.get())
+        except ValueError:
+            return None
+    def stress_positions(self):
+        # Worst price-shock scenario for the open positions, alone and with the trade on screen
+        from tkinter import filedialog
+        path = filedialog.askopenfilename(parent=self, title="Shock scenarios", filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
+        if not path:
+            return
+        import scenarios
+        try:
+            scenario_list, prices = scenarios.load_scenarios(path)
+            engine = scenarios.ScenarioEngine(scenario_list)
+        except Exception as e:
+            self.error_var.set(f"Could not read scenarios: {e}")
+            return
+        candidates = []
+        if self.last_result is not None and self.last_result["symbol"] != "OTHER":
+            candidates.append({"symbol": self.last_result["symbol"], "contracts": self.last_result["contracts"],
+                               "entry": None, "stop": self.stop_price()})
+        result = scenarios.stress(engine, list(self.position_ledger().positions.values()), candidates, prices, self.quote_mid)
+        name, pnl = scenarios.worst(result)
+        text = f"Worst of {len(engine)} scenarios: {name} ${pnl:,.0f} on open positions"
+        if len(result["candidate_symbols"]):
+            name, pnl = scenarios.worst(result, 0)
+            text += f", {name} ${pnl:,.0f} with this trade"
+        if result["skipped"]:
+            text += f" ({len(result['skipped'])} without a price left out)"
+        self.error_var.set(text)
+    def open_positions_window(self):
+        if self.positions_window is None:
+            from positions_window import PositionsWindow
+            self.positions_window = PositionsWindow(self)
+        self.positions_window.lift()
+    @traced()
+    def one_way_risk_edited(self, *args):
+        if self.active_field != "risk":
+            return
+        self.is_updating = True
+        try:
+            risk_str = self.risk_var.get().strip()
+            if not risk_str:
+                self.contracts_var.set("")
+                self.is_updating = False
+                self.calculate()
+                return
+            account_size = float(self.account_var.get().replace(",", "") or "0")
+            risk = float(risk_str)
+            stop_ticks = float(self.stop_var.get() or "0")
+            tick_value = float(self.tick_value_var.get() or "0")
+            mode = self.risk_mode.get()
+            if stop_ticks > 0 and tick_value > 0:
+                risk_dollars = risk if mode == "dollars" else (account_size * risk / 100.0)
+                dollar_risk_per_contract = stop_ticks * tick_value
+                contracts, _ = size_contracts(risk_dollars, dollar_risk_per_contract, account_size, self.margin_per_contract(), self.rules_max_contracts(), self.remaining_risk_budget())
+                self.contracts_var.set(str(contracts if contracts >= 0 else ""))
+        except Exception:
+            self.contracts_var.set("")
+        self.is_updating = False
+        self.calculate()
+    @traced()
+    def one_way_contracts_edited(self, *args):
+        if self.active_field != "contracts":
+            return
+        self.is_updating = True
+        try:
+            contracts_str = self.contracts_var.get().strip()
+            if not contracts_str:
+                self.risk_var.set("")
+                self.is_updating = False
+                self.calculate()
+                return
+            account_size = float(self.account_var.get().replace(",", "") or "0")
+            stop_ticks = float(self.stop_var.get() or "0")
+            tick_value = float(self.tick_value_var.get() or "0")
+            contracts = float(contracts_str)
+            dollar_risk_per_contract = stop_ticks * tick_value
+            risk_dollars = contracts * dollar_risk_per_contract
+            mode = self.risk_mode.get()
+            if mode == "dollars":
+                self.risk_var.set(str(round(risk_dollars, 2) if risk_dollars > 0 else ""))
+            else:
+                risk_percent = (risk_dollars / account_size * 100) if account_size else 0
+                self.risk_var.set(str(round(risk_percent, 2) if risk_percent > 0 else ""))
+        except Exception:
+            self.risk_var.set("")
+        self.is_updating = False
+        self.calculate()
+    @traced()
+    def calculate(self, *args):
+        self.error_var.set("")
+        self.binding_var.set("")
+        self.last_result = None
+        error = False
+
+        self.highlight_entry(self.account_entry, False)
+        self.highlight_entry(self.risk_entry, False)
+        self.highlight_entry(self.stop_entry, False)
+        self.highlight_entry(self.contracts_entry, False)
+        self.highlight_entry(self.instrument_search, False)
+
+        try:
+            account_size = float(self.account_var.get().replace(",", "") or "0")
+            risk_str = self.risk_var.get().strip()
+            contracts_str = self.contracts_var.get().strip()
+            stop_ticks = float(self.stop_var.get() or "0")
+            tick_size = float(self.tick_size_var.get() or "0")
+            tick_value = float(self.tick_value_var.get() or "0")
+            contracts = int(contracts_str) if contracts_str and contracts_str.isdigit() else 0
+            mode = self.risk_mode.get()
+
+            if account_size <= 0:
+                self.error_var.set("Account size must be positive.")
+                self.highlight_entry(self.account_entry, True)
+                error = True
+
+            if stop_ticks <= 0:
+                self.error_var.set("Stop loss (ticks) must be positive.")
+                self.highlight_entry(self.stop_entry, True)
+                error = True
+
+            if tick_size <= 0 or tick_value <= 0:
+                self.error_var.set("Invalid tick size or tick value.")
+                error = True
+
+            if self.instrument_issue:
+                # Rows that failed catalog validation are never sized, as in fanout and scenarios
+                self.error_var.set(self.instrument_issue)
+                self.highlight_entry(self.instrument_search, True)
+                error = True
+
+            min_risk_required = stop_ticks * tick_value if stop_ticks and tick_value else 0
+            self.min_risk_label.config(text=f"Min risk to trade with current stop loss: ${min_risk_required:.2f}", fg="grey")
+            total_risk = contracts * min_risk_required
+            self.total_risk_label.config(text=f"Total risk for {contracts} contracts: ${total_risk:.2f}" + self.var_suffix(contracts, tick_value)
+                                         + self.portfolio_suffix(total_risk), fg="grey")
+
+            if error:
+                self.result_var.set("Contracts to Trade: -")
+                self.result_label.config(fg="red")
+                return
+
+            risk = float(risk_str) if risk_str else 0
+            risk_dollars = risk if mode == "dollars" else (account_size * risk / 100.0 if risk_str else 0)
+            dollar_risk_per_contract = stop_ticks * tick_value
+            margin = self.margin_per_contract()
+
+            rules_cap = self.rules_max_contracts()
+            budget = self.remaining_risk_budget()
+            contracts_calc, binding = size_contracts(risk_dollars, dollar_risk_per_contract, account_size, margin, rules_cap, budget)
+
+            if risk_str and self.active_field == "risk" and not self.is_updating:
+                self.contracts_var.set(str(contracts_calc if contracts_calc > 0 else ""))
+                contracts = contracts_calc
+
+            self.show_binding(binding if risk_str else None, contracts, account_size, margin, rules_cap, budget)
+
+            if risk_dollars < min_risk_required and risk_dollars > 0:
+                self.result_var.set("Contracts to Trade: -")
+                self.result_label.config(fg="red")
+                self.error_var.set(f"Risk per trade is too low. Must be ≥ ${min_risk_required:.2f}")
+                return
+
+            if contracts > 0:
+                self.result_var.set(f"Contracts to Trade: {contracts}")
+                self.result_label.config(fg="green")
+                self.last_result = {
+                    "account": self.account_key(),
+                    "symbol": self.selected_instrument["symbol"] if self.selected_instrument else "OTHER",
+                    "account_size": account_size,
+                    "risk": risk,
+                    "risk_mode": mode,
+                    "stop": stop_ticks,
+                    "tick_size": tick_size,
+                    "tick_value": tick_value,
+                    "contracts": contracts,
+                    "risk_dollars": contracts * dollar_risk_per_contract,
+                }
+                self.schedule_journal()
+            else:
+                self.result_var.set("Contracts to Trade: -")
+                self.result_label.config(fg="red")
+            self.save_last_used()
+        except Exception:
+            self.result_var.set("Contracts to Trade: -")
+            self.result_label.config(fg="red")
+            self.error_var.set("Invalid input. Check your numbers and instrument.")
+
+    def schedule_journal(self):
+        # A result counts as finalized once the inputs sit still for JOURNAL_DELAY_MS
+        if self.journal_after is not None:
+            self.after_cancel(self.journal_after)
+        self.journal_after = self.after(JOURNAL_DELAY_MS, self.journal_calculation)
+
+    def journal_calculation(self):
+        self.journal_after = None
+        if self.last_result is None or self.last_result == self.last_journaled:
+            return
+        self.last_journaled = self.last_result
+        self.journal.record(dict(self.last_result, timestamp=time.time()))
+
+    def on_close(self):
+        if self.journal_after is not None:
+            self.after_cancel(self.journal_after)
+            self.journal_calculation()
+        if self.config_after is not None:
+            self.after_cancel(self.config_after)
+            self.write_last_used()
+        if self.perf_overlay is not None:
+            self.perf_overlay.close()
+        if self.quote_source is not None:
+            self.quote_source.stop()
+        if self.ledger is not None:
+            self.ledger.close_log()
+        if self.loss_source is not None:
+            self.loss_source.stop()
+        self.journal.close()
+        self.profiles.close()
+        self.destroy()
+
+    def copy_result(self):
+        self.clipboard_clear()
+        self.clipboard_append(self.result_var.get())
+
+    def load_last_used(self):
+        cfg = self.config_data
+        if not cfg: return
+        self.profile_var.set(cfg.get("profile", ""))
+        self.apply_settings(cfg)
+
+    def apply_settings(self, cfg):
+        try:
+            # Risk mode first: switching it clears the risk and contracts fields
+            if "risk_mode" in cfg:
+                self.risk_mode.set(cfg["risk_mode"])
+            if "funded" in cfg:
+                self.funded_var.set(bool(cfg["funded"]))
+            if "account" in cfg:
+                presets = {size.replace(",", ""): size for size in ACCOUNT_SIZES}
+                account = str(cfg.get("tier") or cfg["account"]).replace(",", "")
+                if account in presets and account.lower() != "custom":
+                    self.account_combo.set(presets[account])
+                    self.account_size_selected()
+                    if self.funded_var.get():
+                        self.account_var.set(cfg["account"])
+                else:
+                    self.account_combo.set("Custom")
+                    self.account_entry.config(state="normal")
+                    self.account_var.set(cfg["account"])
+            if "risk" in cfg:
+                self.risk_var.set(cfg["risk"])
+            if cfg.get("stop_mode") in ("ticks", "price"):
+                self.stop_mode.set(cfg["stop_mode"])
+                self.stop_price_var.set(cfg.get("stop_price", ""))
+                self.on_stop_mode_change()
+            if "stop" in cfg:
+                self.stop_var.set(cfg["stop"])
+            if "contracts" in cfg:
+                self.contracts_var.set(cfg["contracts"])
+            if cfg.get("margin_type") in MARGIN_TYPES:
+                self.margin_type_var.set(cfg["margin_type"])
+            if "contract_type" in cfg:
+                self.contract_type_var.set(cfg["contract_type"])
+            if "instrument" in cfg:
+                self.instrument_search_var.set(cfg["instrument"])
+            self.calculate()
+        except Exception:
+            pass
+
+    def current_settings(self):
+        return {
+            "account": self.account_var.get(),
+            "tier": self.account_combo.get(),
+            "funded": self.funded_var.get(),
+            "risk": self.risk_var.get(),
+            "risk_mode": self.risk_mode.get(),
+            "margin_type": self.margin_type_var.get(),
+            "stop": self.stop_var.get(),
+            "stop_mode": self.stop_mode.get(),
+            "stop_price": self.stop_price_var.get(),
+            "contracts": self.contracts_var.get(),
+            "contract_type": self.contract_type_var.get(),
+            "instrument": self.instrument_search_var.get()
+        }
+
+    @traced()
+    def save_last_used(self):
+        # Every keystroke recalculates; coalesce the config writes that follow
+        self.pending_config_writes += 1
+        if self.config_after is None:
+            self.config_after = self.after(CONFIG_SAVE_DELAY_MS, self.write_last_used)
+
+    def write_last_used(self):
+        self.config_after = None
+        self.pending_config_writes = 0
+        config = self.current_settings()
+        config["profile"] = self.profile_var.get()
+        save_config(config)
+
+    # --- Profiles
+    def refresh_profile_names(self):
+        # Names are only read when the dropdown opens
+        self.profile_combo["values"] = self.profiles.names()
+
+    @traced()
+    def profile_selected(self, event=None):
+        name = self.profile_var.get().strip()
+        data = self.profiles.load(name) if name else None
+        if data is not None:
+            self.apply_settings(data)
+
+    def save_profile(self):
+        name = self.profile_var.get().strip()
+        if not name:
+            self.error_var.set("Enter a profile name to save.")
+            return
+        self.profiles.save(name, self.current_settings())
+        self.save_last_used()
+
+    def delete_profile(self):
+        name = self.profile_var.get().strip()
+        if name:
+            self.profiles.delete(name)
+            self.profile_var.set("")
+            self.save_last_used()
@@ -0,0 +1,120 @@
+"""Virtualized list for picking one row out of a very large result set.
+
+Only the visible rows exist as Treeview items; scrolling rewrites their text.
+Labels are formatted the first time a row is shown and cached by row key, so
+a new search result costs nothing for rows that are never scrolled into view.
+"""
+from tkinter import font as tkfont
+from tkinter import ttk
+
+class VirtualPicker(ttk.Frame):
+    def __init__(self, master, format_row, height=6, width=32):
+        super().__init__(master)
+        self.format_row = format_row
+        self.labels = {}
+        self.rows = []
+        self.top = 0
+        self.selected = -1
+        self.height = height
+
+        char_width = tkfont.nametofont("TkDefaultFont").measure("0")
+        self.tree = ttk.Treeview(self, show="tree", height=height, selectmode="browse")
+        self.tree.column("#0", width=char_width * width, stretch=True)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self.slots = [self.tree.insert("", "end", text="") for _ in range(height)]
+
+        # Selection and scrolling are handled here; the Treeview only displays the window
+        self.tree.bind("<Button-1>", self.on_click)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-1))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(1))
+        self.tree.bind("<Up>", lambda e: self.move(-1))
+        self.tree.bind("<Down>", lambda e: self.move(1))
+        self.tree.bind("<Prior>", lambda e: self.move(-height))
+        self.tree.bind("<Next>", lambda e: self.move(height))
+        self.tree.bind("<Home>", lambda e: self.move(-len(self.rows)))
+        self.tree.bind("<End>", lambda e: self.move(len(self.rows)))
+
+    def label(self, i):
+        key = self.rows[i]
+        text = self.labels.get(key)
+        if text is None:
+            text = self.labels[key] = self.format_row(key)
+        return text
+
+    def clear_cache(self):
+        self.labels.clear()
+        self.render()
+
+    def set_rows(self, rows):
+        # rows: row keys (any sequence); the first row starts out selected
+        self.rows = rows
+        self.top = 0
+        self.selected = 0 if rows else -1
+        self.render()
+
+    def render(self):
+        count = len(self.rows)
+        for slot, item in enumerate(self.slots):
+            i = self.top + slot
+            self.tree.item(item, text=self.label(i) if i < count else "")
+        slot = self.selected - self.top
+        if self.selected >= 0 and 0 <= slot < self.height:
+            self.tree.selection_set(self.slots[slot])
+        else:
+            self.tree.selection_set(())
+        if count > self.height:
+            self.scrollbar.set(self.top / count, (self.top + self.height) / count)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll_to(self, top):
+        self.top = max(0, min(top, len(self.rows) - self.height))
+        self.render()
+
+    def scroll(self, units):
+        self.scroll_to(self.top + units)
+        return "break"
+
+    def yview(self, *args):
+        # Scrollbar protocol: ("moveto", fraction) or ("scroll", n, "units"|"pages")
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.rows)))
+        elif args[0] == "scroll":
+            step = self.height if args[2] == "pages" else 1
+            self.scroll_to(self.top + int(args[1]) * step)
+
+    def current(self, index=None):
+        if index is None:
+            return self.selected
+        self.selected = max(-1, min(index, len(self.rows) - 1))
+        if self.selected < self.top:
+            self.top = max(self.selected, 0)
+        elif self.selected >= self.top + self.height:
+            self.top = self.selected - self.height + 1
+        self.render()
+        return self.selected
+
+    def get(self):
+        return self.label(self.selected) if self.selected >= 0 else ""
+
+    def select(self, index):
+        # Select a row and notify listeners like a user pick would
+        self.current(index)
+        self.event_generate("<<PickerSelected>>")
+
+    def move(self, offset):
+        if self.rows:
+            self.select(max(0, min(self.selected + offset, len(self.rows) - 1)))
+        return "break"
+
+    def on_click(self, event):
+        self.tree.focus_set()
+        item = self.tree.identify_row(event.y)
+        if item:
+            i = self.top + self.slots.index(item)
+            if i < len(self.rows):
+                self.select(i)
+        return "break"
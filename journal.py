@@ -0,0 +1,239 @@
+"""Append-only journal of finalized calculations.
+
+Rows are appended to the active file (``active-000000.jsonl``) by a
+background thread. Once it holds ``segment_rows`` rows, reaches
+``segment_bytes`` or its oldest row is ``segment_age`` seconds old, it is
+rolled into a compressed columnar segment (``seg-000001.npz``) and summarised
+in ``index.json`` (row count, time range, symbols and accounts), which lets
+queries skip whole segments and read only the columns they need.
+
+A roll writes the segment, then atomically replaces ``index.json`` with one
+that also names the next active file; only then is the old active file
+deleted. Whatever the crash point, exactly one of the segment and the old
+active file is live, so rows are never counted twice.
+
+numpy is only imported to write or read segments, so recording rows costs
+the GUI no startup time.
+"""
+import datetime
+import glob
+import json
+import os
+import queue
+import threading
+
+JOURNAL_DIR = "fpsc_journal"
+SEGMENT_ROWS = 50000
+SEGMENT_BYTES = 4 * 1024 * 1024
+SEGMENT_AGE = 24 * 3600  # seconds
+COLUMNS = {
+    "timestamp": "float64",
+    "account": str,
+    "symbol": str,
+    "account_size": "float64",
+    "risk": "float64",
+    "risk_mode": str,
+    "stop": "float64",
+    "tick_size": "float64",
+    "tick_value": "float64",
+    "contracts": "int64",
+    "risk_dollars": "float64",
+}
+
+def _to_epoch(value):
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time())
+    return value.timestamp()
+
+class Journal:
+    def __init__(self, directory=JOURNAL_DIR, segment_rows=SEGMENT_ROWS, segment_bytes=SEGMENT_BYTES, segment_age=SEGMENT_AGE):
+        self.directory = directory
+        self.segment_rows = segment_rows
+        self.segment_bytes = segment_bytes
+        self.segment_age = segment_age
+        self.index_file = os.path.join(directory, "index.json")
+        os.makedirs(directory, exist_ok=True)
+        self.index, active_name = self._load_index()
+        self.active_file = os.path.join(directory, active_name)
+        for path in glob.glob(os.path.join(directory, "active*.jsonl")):
+            if os.path.basename(path) != active_name:
+                os.remove(path)  # left over from a roll that already reached the index
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._writer, name="fpsc-journal", daemon=True)
+        self.thread.start()
+
+    # --- Writing
+    def record(self, row):
+        row = dict(row)
+        row.setdefault("timestamp", datetime.datetime.now().timestamp())
+        self.queue.put(row)
+
+    def flush(self):
+        # Blocks until everything recorded so far is on disk
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait()
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    def _writer(self):
+        pending = self._read_active()
+        active = open(self.active_file, "a")
+        size = active.tell()
+        if self._roll_due(pending, size):
+            active = self._roll(active, pending)
+            pending, size = [], 0
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                if isinstance(item, threading.Event):
+                    active.flush()
+                    item.set()
+                    continue
+                row = {col: item.get(col, "" if kind is str else 0) for col, kind in COLUMNS.items()}
+                line = json.dumps(row) + "\n"
+                active.write(line)
+                size += len(line)
+                pending.append(row)
+                if self._roll_due(pending, size):
+                    active = self._roll(active, pending)
+                    pending, size = [], 0
+                elif self.queue.empty():
+                    active.flush()
+        finally:
+            active.close()
+
+    def _roll_due(self, rows, size):
+        if not rows:
+            return False
+        return (len(rows) >= self.segment_rows or size >= self.segment_bytes
+                or datetime.datetime.now().timestamp() - rows[0]["timestamp"] >= self.segment_age)
+
+    def _roll(self, active, rows):
+        # Segment, then index naming the next active file, then drop the old one; returns the new file
+        active.close()
+        old = self.active_file
+        self._write_segment(rows)
+        os.remove(old)
+        return open(self.active_file, "a")
+
+    def _write_segment(self, rows):
+        import numpy as np
+        number = len(self.index) + 1  # an unindexed segment from a crashed roll is overwritten
+        name = f"seg-{number:06d}.npz"
+        columns = {col: np.array([r.get(col, "" if kind is str else 0) for r in rows], dtype=kind) for col, kind in COLUMNS.items()}
+        tmp = os.path.join(self.directory, name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **columns)
+        os.replace(tmp, os.path.join(self.directory, name))
+        self.index.append({
+            "file": name,
+            "rows": len(rows),
+            "ts_min": float(columns["timestamp"].min()),
+            "ts_max": float(columns["timestamp"].max()),
+            "symbols": sorted(set(columns["symbol"].tolist())),
+            "accounts": sorted(set(columns["account"].tolist())),
+        })
+        active_name = f"active-{number:06d}.jsonl"
+        tmp = self.index_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"segments": self.index, "active": active_name}, f)
+        os.replace(tmp, self.index_file)
+        self.active_file = os.path.join(self.directory, active_name)
+
+    def _load_index(self):
+        # (segment list, active file name)
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, "r") as f:
+                    index = json.load(f)
+                if isinstance(index, list):
+                    return index, "active.jsonl"  # written before the index named the active file
+                return index["segments"], index["active"]
+            except Exception:
+                pass
+        # Rebuild from whatever segments made it to disk
+        import numpy as np
+        index = []
+        for path in sorted(glob.glob(os.path.join(self.directory, "seg-*.npz"))):
+            with np.load(path) as seg:
+                ts, symbols, accounts = seg["timestamp"], seg["symbol"], seg["account"]
+                index.append({
+                    "file": os.path.basename(path),
+                    "rows": len(ts),
+                    "ts_min": float(ts.min()) if len(ts) else 0.0,
+                    "ts_max": float(ts.max()) if len(ts) else 0.0,
+                    "symbols": sorted(set(symbols.tolist())),
+                    "accounts": sorted(set(accounts.tolist())),
+                })
+        actives = sorted(os.path.basename(p) for p in glob.glob(os.path.join(self.directory, "active-*.jsonl")))
+        return index, actives[-1] if actives else f"active-{len(index):06d}.jsonl"
+
+    def _read_active(self):
+        rows = []
+        if os.path.exists(self.active_file):
+            with open(self.active_file, "r") as f:
+                for line in f:
+                    try:
+                        rows.append(json.loads(line))
+                    except Exception:
+                        pass  # torn last line after a crash
+        return rows
+
+    # --- Querying
+    def iter_query(self, symbol=None, start=None, end=None, account=None, columns=None):
+        """Yield one DataFrame per matching segment, oldest first.
+
+        Segments whose index entry rules out the filters are never opened, and
+        only the filter columns plus ``columns`` are decompressed.
+        """
+        import numpy as np
+        start, end = _to_epoch(start), _to_epoch(end)
+        wanted = list(columns or COLUMNS)
+        needed = set(wanted) | {"timestamp"} | ({"symbol"} if symbol else set()) | ({"account"} if account else set())
+        for meta in list(self.index):
+            if symbol and symbol not in meta["symbols"]:
+                continue
+            if account and account not in meta["accounts"]:
+                continue
+            if (start is not None and meta["ts_max"] < start) or (end is not None and meta["ts_min"] > end):
+                continue
+            with np.load(os.path.join(self.directory, meta["file"])) as seg:
+                data = {col: seg[col] for col in needed}
+            chunk = self._filter(data, symbol, start, end, account, wanted)
+            if len(chunk):
+                yield chunk
+        active = self._read_active()
+        if active:
+            data = {col: np.array([r.get(col) for r in active], dtype=COLUMNS[col]) for col in needed}
+            chunk = self._filter(data, symbol, start, end, account, wanted)
+            if len(chunk):
+                yield chunk
+
+    def query(self, symbol=None, start=None, end=None, account=None, columns=None):
+        import pandas as pd
+        chunks = list(self.iter_query(symbol, start, end, account, columns))
+        if not chunks:
+            return pd.DataFrame(columns=list(columns or COLUMNS))
+        return pd.concat(chunks, ignore_index=True)
+
+    @staticmethod
+    def _filter(data, symbol, start, end, account, wanted):
+        import numpy as np
+        import pandas as pd
+        mask = np.ones(len(data["timestamp"]), dtype=bool)
+        if symbol:
+            mask &= data["symbol"] == symbol
+        if account:
+            mask &= data["account"] == account
+        if start is not None:
+            mask &= data["timestamp"] >= start
+        if end is not None:
+            mask &= data["timestamp"] <= end
+        return pd.DataFrame({col: data[col][mask] for col in wanted})
@@ -0,0 +1,144 @@
+"""Kelly and optimal-f risk fractions from a trade history.
+
+The trade file is a CSV with an ``r`` (or ``r_multiple``) column, or ``pnl``
+and ``risk`` columns from which R = pnl / risk. It is read in chunks of only
+the needed columns.
+
+- Kelly: p - (1 - p) / b, with p the win rate and b the average win over the
+  average loss (in R).
+- Optimal f (Vince): the f in (0, 1) maximizing mean(log(1 + f * R / |worst R|)),
+  found with a vectorized grid search and then safeguarded Newton steps on
+  the derivative (the objective is concave).
+
+Both are reported as percent of the account to risk per trade (per 1R).
+Results are cached per file hash in KELLY_CACHE_FILE.
+
+    python kelly.py trades.csv
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from fpsc_core import file_sha1
+
+KELLY_CACHE_FILE = "fpsc_kelly_cache.json"
+CACHE_ENTRIES = 32
+GRID_POINTS = 16
+GRID_BLOCK = 8  # grid points evaluated per pass (bounds the temporary to GRID_BLOCK x trades)
+REFINE_STEPS = 12
+REFINE_TOLERANCE = 1e-7
+CHUNK_ROWS = 1_000_000
+
+def load_r_multiples(path):
+    import pandas as pd
+    header = pd.read_csv(path, comment="#", nrows=0).columns.str.strip().str.lower()
+    column = next((c for c in ("r", "r_multiple") if c in header), None)
+    if column is None and not {"pnl", "risk"} <= set(header):
+        raise ValueError(f"{path} needs an 'r' column or 'pnl' and 'risk' columns")
+    usecols = lambda c: c.strip().lower() in ((column,) if column else ("pnl", "risk"))
+    parts = []
+    for df in pd.read_csv(path, comment="#", usecols=usecols, chunksize=CHUNK_ROWS):
+        df.columns = df.columns.str.strip().str.lower()
+        if column:
+            r = pd.to_numeric(df[column], errors="coerce").to_numpy(np.float64)
+        else:
+            pnl = pd.to_numeric(df["pnl"], errors="coerce").to_numpy(np.float64)
+            risk = pd.to_numeric(df["risk"], errors="coerce").to_numpy(np.float64)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                r = pnl / np.abs(risk)
+        parts.append(r[np.isfinite(r)])
+    return np.concatenate(parts) if parts else np.empty(0)
+
+def kelly_fraction(r):
+    wins, losses = r[r > 0], r[r < 0]
+    if len(wins) == 0 or len(losses) == 0:
+        return 0.0, 0.0
+    p = len(wins) / len(r)
+    avg_loss = -losses.mean()
+    b = wins.mean() / avg_loss
+    k = max(0.0, p - (1 - p) / b)
+    return float(k), float(k / avg_loss)  # fraction per "average loss" unit, and per 1R
+
+def optimal_f(r):
+    # Returns (f, risk fraction per 1R); 0 when there is no edge
+    worst = r.min() if len(r) else 0.0
+    if worst >= 0 or r.mean() <= 0:
+        return 0.0, 0.0
+    x = r / -worst  # scaled so the worst trade is -1
+    grid = np.linspace(0.0, 1.0, GRID_POINTS + 1)[1:-1]
+    growth = np.empty(len(grid))
+    for start in range(0, len(grid), GRID_BLOCK):
+        f = grid[start:start + GRID_BLOCK, None]
+        growth[start:start + GRID_BLOCK] = np.log1p(f * x).mean(axis=1)
+    best = int(np.argmax(growth))
+    lo = grid[best - 1] if best > 0 else 0.0
+    hi = grid[best + 1] if best + 1 < len(grid) else 1.0 - 1e-9
+    # Concave objective: Newton on g(f) = mean(x / (1 + f x)), falling back to bisection
+    f = grid[best]
+    for _ in range(REFINE_STEPS):
+        y = x / (1.0 + f * x)
+        g = y.mean()
+        if g > 0:
+            lo = f
+        else:
+            hi = f
+        step = g / np.dot(y, y) * len(y)
+        f_next = f + step
+        if not lo < f_next < hi:
+            f_next = (lo + hi) / 2
+        if abs(f_next - f) < REFINE_TOLERANCE:
+            f = f_next
+            break
+        f = f_next
+    return float(f), float(f / -worst)
+
+def analyze(r):
+    kelly, kelly_r = kelly_fraction(r)
+    f, f_r = optimal_f(r)
+    return {
+        "trades": int(len(r)),
+        "win_rate": float((r > 0).mean()) if len(r) else 0.0,
+        "mean_r": float(r.mean()) if len(r) else 0.0,
+        "worst_r": float(r.min()) if len(r) else 0.0,
+        "kelly": kelly,
+        "kelly_risk_pct": kelly_r * 100.0,
+        "optimal_f": f,
+        "optimal_f_risk_pct": f_r * 100.0,
+    }
+
+def analyze_file(path, cache_file=KELLY_CACHE_FILE):
+    digest = file_sha1(path)
+    cache = {}
+    if cache_file and os.path.exists(cache_file):
+        try:
+            with open(cache_file, "r") as f:
+                cache = json.load(f)
+        except Exception:
+            cache = {}
+    if digest in cache:
+        return cache[digest]
+    result = analyze(load_r_multiples(path))
+    if cache_file:
+        cache[digest] = result
+        while len(cache) > CACHE_ENTRIES:
+            cache.pop(next(iter(cache)))
+        with open(cache_file, "w") as f:
+            json.dump(cache, f)
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kelly and optimal-f risk fractions from a trade history.")
+    parser.add_argument("trades", help="CSV with an r column, or pnl and risk columns")
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    result = analyze_file(args.trades, None if args.no_cache else KELLY_CACHE_FILE)
+    print(json.dumps(result, indent=2))
+    print(f"{result['trades']} trades in {time.perf_counter() - start:.3f} s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
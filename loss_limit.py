@@ -0,0 +1,204 @@
+"""Daily loss-limit tracker fed by a stream of realized P&L events.
+
+Each event is one line, CSV ``timestamp,account,pnl`` (epoch seconds) or JSON
+``{"timestamp": ..., "account": ..., "pnl": ...}``. Events come from a file
+(read from the start, then followed as it grows) or from TCP clients sending
+lines to ``--pnl tcp://host:port``. Per account only today's running P&L is
+kept, so applying an event and asking for the remaining budget are O(1). The
+trading day rolls over at DAY_RESET_HOUR in Chicago time (17:00 CST or CDT).
+
+Subscribers are called with (account, day_pnl, remaining) on the feed thread
+each time an account's budget changes; nobody polls.
+
+    python loss_limit.py pnl.csv --limit 1000
+    python loss_limit.py tcp://127.0.0.1:9200 --limit 1000
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+EXCHANGE_TZ = ZoneInfo("America/Chicago")
+DAY_RESET_HOUR = 17
+FOLLOW_INTERVAL = 0.25  # seconds between checks of a followed file that stopped growing
+
+def trading_day(timestamp):
+    # Ordinal of the session a timestamp belongs to; 17:00 Chicago starts the next day's session
+    local = datetime.fromtimestamp(timestamp, EXCHANGE_TZ)
+    return (local + timedelta(hours=24 - DAY_RESET_HOUR)).date().toordinal()
+
+def parse_event(line):
+    # (timestamp, account, pnl) or None for blank, header and comment lines
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("{"):
+        event = json.loads(line)
+        return float(event.get("timestamp", time.time())), str(event["account"]), float(event["pnl"])
+    timestamp, account, pnl = line.split(",")[:3]
+    try:
+        return float(timestamp), account.strip(), float(pnl)
+    except ValueError:
+        return None  # header
+
+class LossTracker:
+    def __init__(self, default_limit=None):
+        self.lock = threading.Lock()
+        self.default_limit = default_limit
+        self.limits = {}
+        self.days = {}  # account -> (trading day, realized P&L that day)
+        self.subscribers = []
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def set_limit(self, account, limit):
+        self.limits[account] = limit
+        self.publish(account)
+
+    def apply(self, timestamp, account, pnl):
+        day = trading_day(timestamp)
+        with self.lock:
+            last_day, total = self.days.get(account, (day, 0.0))
+            if day > last_day:
+                total = 0.0
+            elif day < last_day:
+                return  # late event from a finished day
+            self.days[account] = (day, total + pnl)
+        self.publish(account)
+
+    def apply_line(self, line):
+        try:
+            event = parse_event(line)
+        except (ValueError, KeyError):
+            return
+        if event is not None:
+            self.apply(*event)
+
+    def day_pnl(self, account, now=None):
+        day, total = self.days.get(account, (None, 0.0))
+        return total if day == trading_day(time.time() if now is None else now) else 0.0
+
+    def remaining(self, account, limit=None, now=None):
+        # Dollars the account may still lose today (never negative), or None without a limit
+        if limit is None:
+            limit = self.limits.get(account, self.default_limit)
+        if not limit:
+            return None
+        return max(0.0, limit + self.day_pnl(account, now))
+
+    def publish(self, account):
+        if not self.subscribers:
+            return
+        day_pnl = self.day_pnl(account)
+        remaining = self.remaining(account)
+        for callback in self.subscribers:
+            callback(account, day_pnl, remaining)
+
+class PnlSource:
+    """Feeds a LossTracker from its own thread until stop()."""
+
+    def __init__(self):
+        self.tracker = None
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def start(self, tracker):
+        self.tracker = tracker
+        self.thread = threading.Thread(target=self.run, name=type(self).__name__, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+
+    def run(self):
+        raise NotImplementedError
+
+class FilePnlSource(PnlSource):
+    """Reads a P&L file from the start and then follows what is appended to it."""
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+
+    def run(self):
+        while not os.path.exists(self.path):
+            if self.stopped.wait(FOLLOW_INTERVAL):
+                return
+        with open(self.path, "r") as f:
+            partial = ""
+            while not self.stopped.is_set():
+                line = f.readline()
+                if not line:
+                    self.stopped.wait(FOLLOW_INTERVAL)
+                    continue
+                if not line.endswith("\n"):
+                    partial += line  # writer is mid-line
+                    continue
+                self.tracker.apply_line(partial + line)
+                partial = ""
+
+class SocketPnlSource(PnlSource):
+    """Listens on host:port; every client sends newline-terminated events."""
+
+    def __init__(self, host, port):
+        super().__init__()
+        self.address = (host, int(port))
+
+    def run(self):
+        with socket.create_server(self.address) as server:
+            server.settimeout(0.5)
+            while not self.stopped.is_set():
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    continue
+                threading.Thread(target=self.serve, args=(conn,), daemon=True).start()
+
+    def serve(self, conn):
+        with conn, conn.makefile("r") as lines:
+            for line in lines:
+                if self.stopped.is_set():
+                    return
+                self.tracker.apply_line(line)
+
+def open_source(spec):
+    # A path, or tcp://host:port to listen on
+    if spec.startswith("tcp://"):
+        host, port = spec[len("tcp://"):].rsplit(":", 1)
+        return SocketPnlSource(host, port)
+    return FilePnlSource(spec)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Track daily loss budgets from a realized P&L stream.")
+    parser.add_argument("source", help="P&L event file to follow, or tcp://host:port to listen on")
+    parser.add_argument("--limit", type=float, required=True, help="daily loss limit in dollars")
+    args = parser.parse_args(argv)
+    if not args.limit > 0:
+        parser.error(f"--limit must be a positive dollar amount: {args.limit:g}")
+    tracker = LossTracker(args.limit)
+
+    def report(account, day_pnl, remaining):
+        # remaining is None for an account whose limit was cleared with set_limit
+        print(f"{account},{day_pnl:.2f}," + ("" if remaining is None else f"{remaining:.2f}"), flush=True)
+
+    tracker.subscribe(report)
+    source = open_source(args.source)
+    print("account,day_pnl,remaining", flush=True)
+    source.start(tracker)
+    try:
+        while source.thread.is_alive():
+            source.thread.join(0.5)
+    except KeyboardInterrupt:
+        source.stop()
+    print(f"{len(tracker.days)} accounts tracked", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Columnar OHLC bar archive with chunked, cached ATR statistics.
+
+An archive is a directory holding one raw little-endian file per symbol and
+column (``ES.ts.i8``, ``ES.high.f8``, ...) plus ``meta.json``, whose version
+is bumped on every append. meta.json holds the row counts and is replaced
+atomically after the columns are written, so a crashed append is ignored.
+Columns are memory-mapped and processed in chunks of CHUNK_ROWS bars, so
+multi-gigabyte archives never have to fit in RAM.
+Derived statistics (ATR, true-range percentiles) are cached in
+``stats_cache.json`` under the archive version, so later runs are instant.
+
+    python ohlc_archive.py import bars.csv archive/     # symbol,timestamp,high,low,close
+    python ohlc_archive.py stats archive/ --period 14
+    python position_size_calculator.py --ohlc archive/
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+COLUMNS = {"ts": "<i8", "high": "<f8", "low": "<f8", "close": "<f8"}
+CHUNK_ROWS = 1 << 20
+# True-range histogram for percentiles: log10 bins from 1e-8 to 1e6, 100 per decade
+HIST_MIN_LOG = -8.0
+HIST_BINS_PER_DECADE = 100
+HIST_BINS = 14 * HIST_BINS_PER_DECADE
+PERCENTILES = (0.5, 0.9, 0.99)
+
+class OhlcArchive:
+    def __init__(self, directory):
+        self.directory = directory
+        self.meta_path = os.path.join(directory, "meta.json")
+        self.cache_path = os.path.join(directory, "stats_cache.json")
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r") as f:
+                self.meta = json.load(f)
+        else:
+            self.meta = {"version": 0, "symbols": {}}
+
+    def path(self, symbol, column):
+        return os.path.join(self.directory, f"{symbol}.{column}.{COLUMNS[column][1:]}")
+
+    def symbols(self):
+        return sorted(self.meta["symbols"])
+
+    def rows(self, symbol):
+        return self.meta["symbols"].get(symbol, 0)
+
+    def append(self, symbol, ts, high, low, close):
+        # Bars must be appended in time order per symbol
+        os.makedirs(self.directory, exist_ok=True)
+        columns = {"ts": ts, "high": high, "low": low, "close": close}
+        rows = self.rows(symbol)
+        for column, dtype in COLUMNS.items():
+            with open(self.path(symbol, column), "ab") as f:
+                # Drop bars a crashed append wrote past the committed row count
+                f.truncate(rows * np.dtype(dtype).itemsize)
+                f.write(np.ascontiguousarray(columns[column], dtype=dtype).tobytes())
+        self.meta["symbols"][symbol] = rows + len(ts)
+        self.meta["version"] += 1
+        # meta.json commits the append, so it is replaced whole
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self.meta_path)
+
+    def column(self, symbol, column):
+        n = self.rows(symbol)
+        if n == 0:
+            return np.empty(0, dtype=COLUMNS[column])
+        return np.memmap(self.path(symbol, column), dtype=COLUMNS[column], mode="r", shape=(n,))
+
+    def chunks(self, symbol, columns=("high", "low", "close"), chunk_rows=CHUNK_ROWS):
+        maps = [self.column(symbol, c) for c in columns]
+        for start in range(0, self.rows(symbol), chunk_rows):
+            yield [np.asarray(m[start:start + chunk_rows]) for m in maps]
+
+    def symbol_stats(self, symbol, period=14, chunk_rows=CHUNK_ROWS):
+        """Wilder ATR and true-range percentiles over all bars of one symbol."""
+        alpha = 1.0 / period
+        decay = 1.0 - alpha
+        atr = 0.0
+        prev_close = np.nan
+        bars = 0
+        hist = np.zeros(HIST_BINS + 1, dtype=np.int64)  # bin 0 holds zero ranges
+        for high, low, close in self.chunks(symbol, chunk_rows=chunk_rows):
+            n = len(close)
+            prev = np.empty(n)
+            prev[0] = prev_close
+            prev[1:] = close[:-1]
+            tr = np.maximum(high - low, np.maximum(np.abs(high - prev), np.abs(low - prev)))
+            if bars == 0:
+                tr[0] = high[0] - low[0]
+            # EWMA carried across chunks: atr_end = decay^n * atr_start + sum(alpha * decay^age * tr)
+            weights = alpha * decay ** np.arange(n - 1, -1, -1, dtype=np.float64)
+            if bars == 0:
+                weights[0] = decay ** (n - 1)
+                atr = float(weights @ tr)
+            else:
+                atr = decay ** n * atr + float(weights @ tr)
+            with np.errstate(divide="ignore"):
+                bins = np.floor((np.log10(tr) - HIST_MIN_LOG) * HIST_BINS_PER_DECADE) + 1
+            bins = np.clip(np.nan_to_num(bins, nan=0.0, neginf=0.0), 0, HIST_BINS).astype(np.int64)
+            hist += np.bincount(bins, minlength=HIST_BINS + 1)
+            prev_close = float(close[-1])
+            bars += n
+        stats = {"bars": bars, "atr": atr, "last_close": prev_close}
+        cumulative = np.cumsum(hist)
+        for q in PERCENTILES:
+            i = int(np.searchsorted(cumulative, q * bars)) if bars else 0
+            stats[f"tr_p{round(q * 100)}"] = 0.0 if i == 0 else 10 ** (HIST_MIN_LOG + i / HIST_BINS_PER_DECADE)
+        return stats
+
+    def stats(self, period=14):
+        # {symbol: stats}, computed once per archive version and period
+        key = f"{self.meta['version']}:{period}"
+        if os.path.exists(self.cache_path):
+            with open(self.cache_path, "r") as f:
+                cache = json.load(f)
+            if cache.get("key") == key:
+                return cache["stats"]
+        stats = {symbol: self.symbol_stats(symbol, period) for symbol in self.symbols()}
+        with open(self.cache_path, "w") as f:
+            json.dump({"key": key, "stats": stats}, f)
+        return stats
+
+def import_csv(path, directory, chunksize=1_000_000):
+    # Rows must be in time order per symbol (across chunks too)
+    import pandas as pd
+    archive = OhlcArchive(directory)
+    rows = 0
+    for df in pd.read_csv(path, comment="#", chunksize=chunksize):
+        df["symbol"] = df["symbol"].astype(str).str.strip().str.upper()
+        for symbol, group in df.groupby("symbol", sort=False):
+            archive.append(symbol, group["timestamp"].to_numpy(np.int64), group["high"].to_numpy(),
+                           group["low"].to_numpy(), group["close"].to_numpy())
+        rows += len(df)
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OHLC archive tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="append bars from a CSV (symbol,timestamp,high,low,close)")
+    imp.add_argument("csv")
+    imp.add_argument("archive")
+    st = sub.add_parser("stats", help="print ATR and true-range percentiles per symbol")
+    st.add_argument("archive")
+    st.add_argument("--period", type=int, default=14)
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    if args.command == "import":
+        rows = import_csv(args.csv, args.archive)
+        print(f"{rows} bars imported in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+        return
+    stats = OhlcArchive(args.archive).stats(args.period)
+    for symbol, s in stats.items():
+        print(f"{symbol:10} {s['bars']:>12} bars  ATR {s['atr']:.6g}  TR p50 {s['tr_p50']:.6g}  p90 {s['tr_p90']:.6g}  p99 {s['tr_p99']:.6g}")
+    print(f"{len(stats)} symbols in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""In-app performance panel (F12).
+
+Turns on tracing.enable_stats() while open and refreshes once a second from
+an after() timer, so it adds nothing to the handlers it measures beyond the
+stats bookkeeping. Imported only when the panel is first opened.
+"""
+import time
+import tkinter as tk
+
+import tracing
+from fpsc_core import SEARCH_STATS, catalog_footprint, get_catalog
+
+REFRESH_MS = 1000
+
+class PerfOverlay(tk.Toplevel):
+    def __init__(self, app):
+        super().__init__(app)
+        self.app = app
+        self.title("Performance")
+        self.resizable(False, False)
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.text = tk.Label(self, font=("Courier", 9), justify="left", anchor="w", padx=8, pady=8)
+        self.text.pack(fill="both")
+
+        tracing.enable_stats()
+        self.catalog = None
+        self.footprint = 0
+        self.last_calcs = self.calculate_count()
+        self.last_time = time.perf_counter()
+        self.after_id = None
+        self.refresh()
+
+    def calculate_count(self):
+        entry = tracing.stats().get("FPSCApp.calculate")
+        return entry.count if entry else 0
+
+    def refresh(self):
+        now = time.perf_counter()
+        calcs = self.calculate_count()
+        rate = (calcs - self.last_calcs) / (now - self.last_time) if now > self.last_time else 0.0
+        self.last_calcs, self.last_time = calcs, now
+
+        catalog = get_catalog()
+        if catalog is not self.catalog:
+            # Walking the catalog is slow; only redo it when the catalog is swapped
+            self.catalog = catalog
+            self.footprint = catalog_footprint()
+        searches = sum(SEARCH_STATS.values())
+
+        lines = [
+            f"Recalcs/sec:          {rate:8.1f}",
+            f"Search index hits:    {SEARCH_STATS['hits'] / searches * 100 if searches else 0.0:7.1f}%  "
+            f"({SEARCH_STATS['hits']} hit, {SEARCH_STATS['misses']} miss)",
+            f"Pending config saves: {self.app.pending_config_writes:8d}",
+            f"Catalog:              {len(catalog[0]):8d} rows  {self.footprint / 1048576:.1f} MiB",
+            "",
+            f"{'handler':34} {'calls':>7} {'last ms':>9} {'p99 ms':>9}",
+        ]
+        for name, entry in sorted(tracing.stats().items()):
+            lines.append(f"{name:34} {entry.count:7d} {entry.last_ns / 1e6:9.3f} {entry.percentile_ns(0.99) / 1e6:9.3f}")
+        self.text.config(text="\n".join(lines))
+        self.after_id = self.after(REFRESH_MS, self.refresh)
+
+    def close(self):
+        if self.after_id is not None:
+            self.after_cancel(self.after_id)
+            self.after_id = None
+        tracing.disable_stats()
+        self.app.perf_overlay = None
+        self.destroy()
@@ -0,0 +1,126 @@
+"""Correlation-aware risk of the open positions.
+
+Each position (see exposure.ExposureLedger) carries its stop risk in dollars
+and its side. Per symbol the risks are summed, signed by side (long +, short
+-), into an exposure vector r, and the portfolio risk is sqrt(r' C r) with C
+the correlation matrix of the symbols' price changes (from the files in
+RETURNS_DIR, last CORRELATION_WINDOW changes). So a long and a short in
+positively correlated symbols offset, and in negatively correlated ones add
+up. With every correlation at 1 and all positions long this is the plain sum
+of the stop risks.
+
+PortfolioRisk keeps s = C r and v = r' C r up to date with rank-one updates,
+so adding or removing a position is O(n) and "what if I add this trade" is
+O(1), even with a few hundred symbols. A symbol enters the matrix the first
+time it is used; only its own column is computed. Symbols without enough
+history are treated as perfectly correlated with everything (conservative).
+"""
+import math
+import os
+
+import numpy as np
+
+from fpsc_core import RETURNS_DIR
+from var_model import load_changes, returns_path
+
+CORRELATION_WINDOW = 500
+RESYNC_UPDATES = 1000  # recompute v exactly this often to shed rounding drift
+
+def signed_risk(position):
+    return position.get("side", 1) * position["risk"]
+
+class PortfolioRisk:
+    def __init__(self, directory=RETURNS_DIR, window=CORRELATION_WINDOW, capacity=16):
+        self.directory = directory
+        self.window = window
+        self.index = {}
+        self.count = 0
+        self.z = np.zeros((capacity, window))  # standardized changes per symbol (unit norm)
+        self.has_history = np.zeros(capacity, dtype=bool)
+        self.corr = np.zeros((capacity, capacity))
+        self.r = np.zeros(capacity)
+        self.s = np.zeros(capacity)
+        self.v = 0.0
+        self.updates = 0
+
+    def standardized(self, symbol):
+        path = returns_path(symbol, self.directory)
+        if not os.path.exists(path):
+            return None
+        try:
+            changes = load_changes(path)[-self.window:]
+        except Exception:
+            return None
+        std = changes.std() if len(changes) == self.window else 0.0
+        if std <= 0:
+            return None
+        return (changes - changes.mean()) / (std * math.sqrt(self.window))
+
+    def ensure(self, symbol):
+        # Matrix slot for symbol, adding its correlation column on first use
+        j = self.index.get(symbol)
+        if j is not None:
+            return j
+        j = self.count
+        if j == len(self.r):
+            self.grow(2 * j)
+        z = self.standardized(symbol)
+        column = np.ones(j + 1)
+        if z is not None:
+            self.z[j] = z
+            self.has_history[j] = True
+            known = self.has_history[:j]
+            column[:j][known] = np.clip(self.z[:j][known] @ z, -1.0, 1.0)
+        self.corr[j, :j + 1] = column
+        self.corr[:j + 1, j] = column
+        self.s[j] = float(column[:j] @ self.r[:j])
+        self.count += 1
+        self.index[symbol] = j
+        return j
+
+    def grow(self, capacity):
+        n = len(self.r)
+        corr = np.zeros((capacity, capacity))
+        corr[:n, :n] = self.corr
+        self.corr = corr
+        self.z = np.concatenate([self.z, np.zeros((capacity - n, self.window))])
+        self.has_history = np.concatenate([self.has_history, np.zeros(capacity - n, dtype=bool)])
+        self.r = np.concatenate([self.r, np.zeros(capacity - n)])
+        self.s = np.concatenate([self.s, np.zeros(capacity - n)])
+
+    def update(self, symbol, delta):
+        # Rank-one update for r += delta * e_j
+        j = self.ensure(symbol)
+        n = self.count
+        self.v += 2.0 * delta * self.s[j] + delta * delta * self.corr[j, j]
+        self.s[:n] += delta * self.corr[:n, j]
+        self.r[j] += delta
+        self.updates += 1
+        if self.updates % RESYNC_UPDATES == 0:
+            self.resync()
+
+    def resync(self):
+        n = self.count
+        self.s[:n] = self.corr[:n, :n] @ self.r[:n]
+        self.v = float(self.r[:n] @ self.s[:n])
+
+    def risk(self):
+        return math.sqrt(max(self.v, 0.0))
+
+    def linear_risk(self):
+        return float(np.abs(self.r).sum())
+
+    def follow(self, ledger):
+        # Mirror an ExposureLedger: seed from its open positions, then track its events
+        for p in ledger.positions.values():
+            self.update(p["symbol"], signed_risk(p))
+        ledger.listeners.append(self.on_ledger_event)
+
+    def on_ledger_event(self, op, position):
+        risk = signed_risk(position)
+        self.update(position["symbol"], risk if op == "open" else -risk)
+
+    def risk_with(self, symbol, delta):
+        # Portfolio risk if delta more dollars of risk were added in symbol (not applied; negative for a short)
+        j = self.ensure(symbol)
+        return math.sqrt(max(self.v + 2.0 * delta * self.s[j] + delta * delta * self.corr[j, j], 0.0))
@@ -1,12 +1,22 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
+import sys
+
+# Bake the workbook and margins into catalog_data.py so the EXE never parses Excel.
+# Put an edited apex_tradable_instruments.xlsx next to the EXE to override it.
+sys.path.insert(0, SPECPATH)
+import build_catalog
+build_catalog.build(os.path.join(SPECPATH, 'apex_tradable_instruments.xlsx'),
+                    os.path.join(SPECPATH, 'apex_margin_requirements.csv'),
+                    os.path.join(SPECPATH, 'catalog_data.py'))
 
 
 a = Analysis(
     ['position_size_calculator.py'],
     pathex=[],
     binaries=[],
-    datas=[('apex_tradable_instruments.xlsx', '.')],
-    hiddenimports=[],
+    datas=[('apex_account_rules.json', '.')],
+    hiddenimports=['catalog_data'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,37 @@
+"""Open positions list with Remove, opened from the main window."""
+import tkinter as tk
+from tkinter import ttk
+
+class PositionsWindow(tk.Toplevel):
+    def __init__(self, app):
+        super().__init__(app)
+        self.app = app
+        self.title("Open Positions")
+        self.transient(app)
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.listbox = tk.Listbox(self, width=62, height=12, font=("Courier", 9))
+        self.listbox.pack(fill="both", expand=True, padx=8, pady=(8, 4))
+        buttons = tk.Frame(self)
+        buttons.pack(fill="x", padx=8, pady=(0, 8))
+        ttk.Button(buttons, text="Remove", command=self.remove_selected).pack(side="left")
+        ttk.Button(buttons, text="Close", command=self.close).pack(side="right")
+        self.refresh()
+
+    def refresh(self):
+        self.listbox.delete(0, "end")
+        self.ids = []
+        for p in self.app.position_ledger().positions.values():
+            self.ids.append(p["id"])
+            self.listbox.insert("end", f"#{p['id']:<4} {p['account'][:12]:12} {p['symbol']:10} {p['contracts']:>5} ct   risk ${p['risk']:,.2f}")
+
+    def remove_selected(self):
+        selection = self.listbox.curselection()
+        if not selection:
+            return
+        self.app.position_ledger().close(self.ids[selection[0]])
+        self.refresh()
+        self.app.show_positions()
+
+    def close(self):
+        self.app.positions_window = None
+        self.destroy()
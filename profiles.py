@@ -0,0 +1,59 @@
+"""Named setting profiles in a local SQLite database.
+
+One connection is kept open for the life of the store; sqlite3 caches the
+prepared statement for each SQL string below on that connection. Only names
+are read to populate pickers, the settings themselves are read on demand.
+"""
+import json
+import sqlite3
+import time
+
+PROFILE_DB = "fpsc_profiles.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    name TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_profiles_last_used ON profiles (last_used DESC);
+"""
+_SELECT_NAMES = "SELECT name FROM profiles ORDER BY last_used DESC LIMIT ?"
+_SELECT_DATA = "SELECT data FROM profiles WHERE name = ?"
+_TOUCH = "UPDATE profiles SET last_used = ? WHERE name = ?"
+_UPSERT = (
+    "INSERT INTO profiles (name, data, last_used) VALUES (?, ?, ?) "
+    "ON CONFLICT(name) DO UPDATE SET data = excluded.data, last_used = excluded.last_used"
+)
+_DELETE = "DELETE FROM profiles WHERE name = ?"
+
+class ProfileStore:
+    def __init__(self, path=PROFILE_DB):
+        self.conn = sqlite3.connect(path, cached_statements=32)
+        self.conn.executescript(_SCHEMA)
+
+    def names(self, limit=-1):
+        # Most recently used first
+        return [row[0] for row in self.conn.execute(_SELECT_NAMES, (limit,))]
+
+    def load(self, name):
+        row = self.conn.execute(_SELECT_DATA, (name,)).fetchone()
+        if row is None:
+            return None
+        with self.conn:
+            self.conn.execute(_TOUCH, (time.time(), name))
+        try:
+            return json.loads(row[0])
+        except Exception:
+            return {}
+
+    def save(self, name, data):
+        with self.conn:
+            self.conn.execute(_UPSERT, (name, json.dumps(data), time.time()))
+
+    def delete(self, name):
+        with self.conn:
+            self.conn.execute(_DELETE, (name,))
+
+    def close(self):
+        self.conn.close()
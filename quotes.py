@@ -0,0 +1,137 @@
+"""Quote sources and the latest-quote cache.
+
+A quote source runs on its own thread and publishes (timestamp, symbol, bid,
+ask) into a QuoteCache; the GUI polls the cache once per frame, so a burst of
+ticks costs at most one recalculation per frame. ReplaySource streams
+recorded quotes from CSV (``timestamp,symbol,bid,ask``, epoch seconds) or the
+compact binary format written by ``convert``:
+
+    python quotes.py convert ticks.csv ticks.fpq
+    python position_size_calculator.py --replay ticks.fpq --replay-speed 10
+"""
+import argparse
+import csv
+import struct
+import sys
+import threading
+import time
+
+BINARY_MAGIC = b"FPSCQ1\n\0"
+RECORD = struct.Struct("<d8sdd")  # timestamp, symbol (NUL padded), bid, ask
+CHUNK_RECORDS = 4096
+
+class QuoteCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.quotes = {}
+        self.changed = set()
+        self.listeners = []  # called with every quote on the feed thread (e.g. VolatilityEngine.update_quote)
+
+    def update(self, symbol, timestamp, bid, ask):
+        with self.lock:
+            self.quotes[symbol] = (timestamp, bid, ask)
+            self.changed.add(symbol)
+        for listener in self.listeners:
+            listener(symbol, timestamp, bid, ask)
+
+    def get(self, symbol):
+        # (timestamp, bid, ask) or None
+        return self.quotes.get(symbol)
+
+    def drain_changed(self):
+        # Symbols updated since the last call
+        with self.lock:
+            changed, self.changed = self.changed, set()
+        return changed
+
+class QuoteSource:
+    """Base class for quote feeds: run() publishes through self.cache.update until self.stopped is set."""
+
+    def __init__(self):
+        self.cache = None
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def start(self, cache):
+        self.cache = cache
+        self.thread = threading.Thread(target=self.run, name=type(self).__name__, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+
+    def run(self):
+        raise NotImplementedError
+
+def read_csv_quotes(path):
+    with open(path, "r", newline="") as f:
+        for row in csv.DictReader(line for line in f if not line.startswith("#")):
+            yield float(row["timestamp"]), row["symbol"].strip().upper(), float(row["bid"]), float(row["ask"])
+
+def read_binary_quotes(path):
+    with open(path, "rb") as f:
+        if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise ValueError(f"{path} is not a quote file")
+        while True:
+            chunk = f.read(RECORD.size * CHUNK_RECORDS)
+            if not chunk:
+                return
+            chunk = chunk[:len(chunk) - len(chunk) % RECORD.size]
+            for timestamp, symbol, bid, ask in RECORD.iter_unpack(chunk):
+                yield timestamp, symbol.rstrip(b"\0").decode("ascii"), bid, ask
+
+def read_quotes(path):
+    with open(path, "rb") as f:
+        binary = f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+    return read_binary_quotes(path) if binary else read_csv_quotes(path)
+
+def write_binary_quotes(quotes, path):
+    count = 0
+    with open(path, "wb") as f:
+        f.write(BINARY_MAGIC)
+        for timestamp, symbol, bid, ask in quotes:
+            f.write(RECORD.pack(timestamp, symbol.encode("ascii")[:8], bid, ask))
+            count += 1
+    return count
+
+class ReplaySource(QuoteSource):
+    """Replays a recorded quote file; speed is a multiple of real time (0 = as fast as possible)."""
+
+    def __init__(self, path, speed=1.0, loop=False):
+        super().__init__()
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+
+    def run(self):
+        while not self.stopped.is_set():
+            wall_start = time.monotonic()
+            first = None
+            for timestamp, symbol, bid, ask in read_quotes(self.path):
+                if self.speed > 0:
+                    if first is None:
+                        first = timestamp
+                    delay = (timestamp - first) / self.speed - (time.monotonic() - wall_start)
+                    if delay > 0 and self.stopped.wait(delay):
+                        return
+                elif self.stopped.is_set():
+                    return
+                self.cache.update(symbol, timestamp, bid, ask)
+            if not self.loop:
+                return
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quote file tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    convert = sub.add_parser("convert", help="convert a CSV quote file to the binary format")
+    convert.add_argument("csv")
+    convert.add_argument("out")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    count = write_binary_quotes(read_csv_quotes(args.csv), args.out)
+    print(f"{count} quotes written to {args.out} in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
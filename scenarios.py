@@ -0,0 +1,171 @@
+"""Price-shock scenarios by category and symbol.
+
+A scenario file is JSON:
+
+    {"prices": {"ES": 5000, "CL": 78.5},
+     "scenarios": [{"name": "risk-off", "categories": {"Equity Futures": -5, "Energy Futures": 8},
+                    "symbols": {"NQ": -7}}]}
+
+Shocks are percent of price; a symbol shock replaces its category's shock.
+``prices`` (optional) are reference prices for positions without an entry or
+a live quote. A bare list of scenarios is accepted too.
+
+ScenarioEngine compiles the scenarios once into a (scenarios x categories)
+matrix and a (scenarios x symbols) override matrix (NaN where a scenario
+doesn't name the symbol). Evaluating a book gathers one column per position,
+so P&L for every scenario and position at once is a few array operations:
+
+    pnl = round(shock * price / tick_size) * tick_size * point_value * signed contracts
+
+(the catalog's tick_value column holds the point value, dollars per point).
+
+Positions use their recorded side; otherwise they are long unless their stop
+is above the entry.
+
+    python scenarios.py shocks.json
+    python scenarios.py shocks.json --candidate ES:2:5000
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+import fpsc_core as fpsc
+from exposure import position_side
+
+def load_scenarios(path):
+    # (scenarios, reference prices)
+    with open(path, "r") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return data, {}
+    return data.get("scenarios", []), {k.upper(): float(v) for k, v in data.get("prices", {}).items()}
+
+class ScenarioEngine:
+    def __init__(self, scenarios):
+        self.names = [s.get("name", f"#{i + 1}") for i, s in enumerate(scenarios)]
+        self.categories = sorted({c for s in scenarios for c in s.get("categories", {})})
+        self.symbols = sorted({k.upper() for s in scenarios for k in s.get("symbols", {})})
+        self.category_index = {c: i for i, c in enumerate(self.categories)}
+        self.symbol_index = {k: i for i, k in enumerate(self.symbols)}
+        # One extra column each: zero shock / no override for anything a scenario doesn't name
+        self.category_shocks = np.zeros((len(scenarios), len(self.categories) + 1))
+        self.symbol_shocks = np.full((len(scenarios), len(self.symbols) + 1), np.nan)
+        for i, s in enumerate(scenarios):
+            for c, shock in s.get("categories", {}).items():
+                self.category_shocks[i, self.category_index[c]] = float(shock) / 100.0
+            for k, shock in s.get("symbols", {}).items():
+                self.symbol_shocks[i, self.symbol_index[k.upper()]] = float(shock) / 100.0
+
+    def __len__(self):
+        return len(self.names)
+
+    def shocks(self, categories, symbols):
+        # (scenarios x positions) fractional price moves
+        ci = np.array([self.category_index.get(c, -1) for c in categories], dtype=np.intp)
+        si = np.array([self.symbol_index.get(k, -1) for k in symbols], dtype=np.intp)
+        shock = self.category_shocks[:, ci]
+        override = self.symbol_shocks[:, si]
+        return np.where(np.isnan(override), shock, override)
+
+    def evaluate(self, book):
+        # (scenarios x positions) P&L in dollars
+        ticks = self.shocks(book["category"], book["symbol"])
+        ticks *= book["price"] / book["tick_size"]
+        np.round(ticks, out=ticks)
+        ticks *= book["tick_size"] * book["point_value"] * book["contracts"]
+        return ticks
+
+def build_book(positions, prices=None, quote=None):
+    """Arrays for evaluate() from position dicts (symbol, contracts, entry, stop).
+
+    The price is the entry, else quote(symbol), else prices[symbol]. Returns
+    (book, skipped) with the positions that had no price or no valid instrument.
+    """
+    prices = prices or {}
+    rows, skipped = [], []
+    for p in positions:
+        symbol = str(p["symbol"]).upper()
+        row = fpsc.find_row(symbol)
+        inst = fpsc.get_catalog()[0][row] if row is not None and fpsc.instrument_valid(row) else None
+        price = p.get("entry") or (quote(symbol) if quote else None) or prices.get(symbol)
+        if inst is None or not price:
+            skipped.append(p)
+            continue
+        side = p.get("side") or position_side(price, p.get("stop"))
+        rows.append((symbol, p.get("category") or inst["category"], float(price), inst["tick_size"],
+                     inst["tick_value"], side * p["contracts"]))
+    columns = list(zip(*rows)) or [()] * 6
+    book = {
+        "symbol": list(columns[0]),
+        "category": list(columns[1]),
+        "price": np.array(columns[2], dtype=np.float64),
+        "tick_size": np.array(columns[3], dtype=np.float64),
+        "point_value": np.array(columns[4], dtype=np.float64),
+        "contracts": np.array(columns[5], dtype=np.float64),
+    }
+    return book, skipped
+
+def stress(engine, positions, candidates=(), prices=None, quote=None):
+    """Scenario P&L of the open positions, alone and with each candidate added.
+
+    Returns {"names", "open" (per scenario), "candidates" (scenarios x
+    priced candidates, open + candidate), "candidate_symbols", "skipped"}.
+    """
+    book, skipped = build_book(positions, prices, quote)
+    candidate_book, candidates_skipped = build_book(candidates, prices, quote)
+    open_pnl = engine.evaluate(book).sum(axis=1)
+    return {
+        "names": engine.names,
+        "open": open_pnl,
+        "candidates": open_pnl[:, None] + engine.evaluate(candidate_book),
+        "candidate_symbols": candidate_book["symbol"],
+        "skipped": skipped + candidates_skipped,
+    }
+
+def worst(result, column=None):
+    # (scenario name, P&L) of the worst scenario for the open book or one candidate column
+    values = result["open"] if column is None else result["candidates"][:, column]
+    if len(values) == 0:
+        return None, 0.0
+    i = int(np.argmin(values))
+    return result["names"][i], float(values[i])
+
+def parse_candidate(text):
+    # SYMBOL:CONTRACTS[:PRICE[:STOP]]
+    parts = text.split(":")
+    return {
+        "symbol": parts[0].upper(),
+        "contracts": int(parts[1]),
+        "entry": float(parts[2]) if len(parts) > 2 else None,
+        "stop": float(parts[3]) if len(parts) > 3 else None,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stress the open positions with price-shock scenarios.")
+    parser.add_argument("scenarios", help="scenario JSON file")
+    parser.add_argument("--candidate", action="append", default=[], type=parse_candidate, metavar="SYM:N[:PRICE[:STOP]]",
+                        help="a sized trade to stress on top of the open positions (repeatable)")
+    parser.add_argument("--top", type=int, default=10, help="scenarios to print, worst first")
+    args = parser.parse_args(argv)
+    from exposure import ExposureLedger
+    ledger = ExposureLedger()
+    ledger.close_log()
+    scenarios, prices = load_scenarios(args.scenarios)
+    engine = ScenarioEngine(scenarios)
+    fpsc.get_catalog()
+    start = time.perf_counter()
+    result = stress(engine, list(ledger.positions.values()), args.candidate, prices)
+    elapsed = time.perf_counter() - start
+    header = "scenario,open_pnl" + "".join(f",with_{symbol}" for symbol in result["candidate_symbols"])
+    print(header)
+    for i in np.argsort(result["open"])[:args.top]:
+        print(f"{result['names'][i]},{result['open'][i]:.2f}" + "".join(f",{v:.2f}" for v in result["candidates"][i]))
+    for p in result["skipped"]:
+        print(f"skipped {p['symbol']}: no price or no valid instrument", file=sys.stderr)
+    print(f"{len(engine)} scenarios x {len(ledger.positions) + len(args.candidate)} positions in {elapsed * 1000:.2f} ms", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
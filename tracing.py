@@ -0,0 +1,155 @@
+"""Opt-in tracing spans, dumpable as Chrome trace JSON, and per-span latency stats.
+
+Spans are recorded with monotonic nanosecond timestamps into a preallocated
+ring buffer (the oldest spans are overwritten). Separately, enable_stats()
+keeps a call count, last duration and log-bucketed latency histogram per span
+name for the in-app performance panel. While both are off a traced function
+costs one flag check. Open a dump in chrome://tracing or Perfetto.
+"""
+import functools
+import json
+import math
+import os
+import threading
+import time
+
+DEFAULT_CAPACITY = 65536
+BUCKETS_PER_OCTAVE = 4
+HISTOGRAM_BUCKETS = 64 * BUCKETS_PER_OCTAVE
+
+_enabled = False
+_stats_enabled = False
+_active = False
+_capacity = 0
+_names = []
+_starts = []
+_durations = []
+_threads = []
+_count = 0
+_lock = threading.Lock()
+_stats = {}
+
+class LatencyStats:
+    __slots__ = ("count", "last_ns", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.last_ns = 0
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, duration_ns):
+        self.count += 1
+        self.last_ns = duration_ns
+        bucket = int(math.log2(duration_ns) * BUCKETS_PER_OCTAVE) if duration_ns > 1 else 0
+        self.buckets[min(bucket, HISTOGRAM_BUCKETS - 1)] += 1
+
+    def percentile_ns(self, q):
+        # Upper edge of the bucket holding the q-th sample
+        if not self.count:
+            return 0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return 2 ** ((i + 1) / BUCKETS_PER_OCTAVE)
+        return 2 ** (HISTOGRAM_BUCKETS / BUCKETS_PER_OCTAVE)
+
+def enable(capacity=DEFAULT_CAPACITY):
+    global _enabled, _active, _capacity, _names, _starts, _durations, _threads, _count
+    with _lock:
+        if _capacity != capacity:
+            _capacity = capacity
+            _names = [None] * capacity
+            _starts = [0] * capacity
+            _durations = [0] * capacity
+            _threads = [0] * capacity
+        _count = 0  # each session's trace starts empty
+        _enabled = True
+        _active = True
+
+def disable():
+    global _enabled, _active
+    _enabled = False
+    _active = _stats_enabled
+
+def is_enabled():
+    return _enabled
+
+def enable_stats():
+    global _stats_enabled, _active
+    _stats_enabled = True
+    _active = True
+
+def disable_stats():
+    global _stats_enabled, _active
+    _stats_enabled = False
+    _active = _enabled
+
+def stats():
+    # {span name: LatencyStats}; live objects, read them on the Tk thread
+    return _stats
+
+def record(name, start_ns, duration_ns):
+    global _count
+    with _lock:
+        if _enabled:
+            i = _count % _capacity
+            _names[i] = name
+            _starts[i] = start_ns
+            _durations[i] = duration_ns
+            _threads[i] = threading.get_ident()
+            _count += 1
+        if _stats_enabled:
+            entry = _stats.get(name)
+            if entry is None:
+                entry = _stats[name] = LatencyStats()
+            entry.add(duration_ns)
+
+def traced(name=None):
+    """Decorator recording a span for every call while tracing or stats are enabled."""
+    def decorator(fn):
+        label = name or fn.__qualname__
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _active:
+                return fn(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(label, start, time.perf_counter_ns() - start)
+        return wrapper
+    return decorator
+
+class span:
+    """Context manager form of traced() for blocks that aren't functions."""
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns() if _active else 0
+        return self
+
+    def __exit__(self, *exc):
+        if _active and self.start:
+            record(self.name, self.start, time.perf_counter_ns() - self.start)
+        return False
+
+def spans():
+    # Recorded spans, oldest first: (name, start_ns, duration_ns, thread id)
+    with _lock:
+        n = min(_count, _capacity)
+        first = _count - n
+        return [(_names[i % _capacity], _starts[i % _capacity], _durations[i % _capacity], _threads[i % _capacity])
+                for i in range(first, _count)]
+
+def dump_chrome_trace(path):
+    pid = os.getpid()
+    events = [{"name": name, "ph": "X", "ts": start / 1000.0, "dur": duration / 1000.0, "pid": pid, "tid": tid}
+              for name, start, duration, tid in spans()]
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return len(events)
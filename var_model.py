@@ -0,0 +1,103 @@
+"""Historical-simulation VaR / CVaR per contract from local price histories.
+
+Each instrument has a CSV in RETURNS_DIR named after its symbol (``ES.csv``)
+with a ``close`` column (or ``change``, the price change per bar). The price
+changes over the horizon of the latest ``window`` bars are sorted once and
+cached per symbol with prefix sums, so VaR and CVaR for any contract count
+(and any confidence) are O(1) lookups and never slow down typing. Both tails are checked, since
+the form doesn't know whether the trade is long or short.
+
+Stressed VaR is the worst VaR over rolling windows of the whole history,
+computed with vectorized quantiles over a strided window view.
+"""
+import csv
+import math
+import os
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from fpsc_core import RETURNS_DIR
+
+MAX_ROLLING_WINDOWS = 1000
+
+def returns_path(symbol, directory=RETURNS_DIR):
+    return os.path.join(directory, f"{symbol}.csv")
+
+def load_changes(path, horizon=1):
+    # Price changes over `horizon` bars, oldest first
+    with open(path, "r", newline="") as f:
+        reader = csv.DictReader(line for line in f if not line.startswith("#"))
+        column = "change" if "change" in reader.fieldnames else "close"
+        values = np.array([float(row[column]) for row in reader if row[column]], dtype=np.float64)
+    if column == "change":
+        return np.convolve(values, np.ones(horizon), "valid") if horizon > 1 else values
+    return values[horizon:] - values[:-horizon]
+
+def tail_stats(sorted_changes, prefix, confidence):
+    # Worst-side (VaR, CVaR) in points from an ascending array and its prefix sums (prefix[0] == 0)
+    n = len(sorted_changes)
+    k = max(1, int(math.ceil(n * (1 - confidence))))
+    long_var = -sorted_changes[k - 1]
+    long_cvar = -prefix[k] / k
+    short_var = sorted_changes[n - k]
+    short_cvar = (prefix[n] - prefix[n - k]) / k
+    return float(max(long_var, short_var)), float(max(long_cvar, short_cvar))
+
+def rolling_var(changes, window, confidence):
+    # Worst-side VaR (points) for each of up to MAX_ROLLING_WINDOWS rolling windows
+    if len(changes) < window:
+        return np.empty(0)
+    windows = sliding_window_view(changes, window)
+    windows = windows[::max(1, len(windows) // MAX_ROLLING_WINDOWS)]
+    low, high = np.quantile(windows, [1 - confidence, confidence], axis=1)
+    return np.maximum(-low, high)
+
+class HistoricalVaR:
+    def __init__(self, directory=RETURNS_DIR, window=500, horizon=1, confidence=0.99):
+        self.directory = directory
+        self.window = window
+        self.horizon = horizon
+        self.confidence = confidence
+        self.profiles = {}  # symbol -> (file mtime, profile or None)
+
+    def has_history(self, symbol):
+        return os.path.exists(returns_path(symbol, self.directory))
+
+    def profile(self, symbol):
+        """Per-contract tail stats in points for the latest window, or None without history."""
+        path = returns_path(symbol, self.directory)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        cached = self.profiles.get(symbol)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        profile = None
+        changes = load_changes(path, self.horizon)
+        if len(changes) >= 20:
+            recent = np.sort(changes[-self.window:])
+            prefix = np.concatenate([[0.0], np.cumsum(recent)])
+            var, cvar = tail_stats(recent, prefix, self.confidence)
+            stressed = rolling_var(changes, min(self.window, len(changes)), self.confidence)
+            profile = {
+                "sorted": recent,
+                "prefix": prefix,
+                "var": var,
+                "cvar": cvar,
+                "stressed_var": float(stressed.max()) if len(stressed) else var,
+            }
+        self.profiles[symbol] = (mtime, profile)
+        return profile
+
+    def position_risk(self, symbol, contracts, point_value, confidence=None):
+        # (VaR, CVaR, stressed VaR) in dollars for `contracts`, or None
+        profile = self.profile(symbol)
+        if profile is None:
+            return None
+        var, cvar = profile["var"], profile["cvar"]
+        if confidence is not None and confidence != self.confidence:
+            var, cvar = tail_stats(profile["sorted"], profile["prefix"], confidence)
+        scale = contracts * point_value
+        return var * scale, cvar * scale, profile["stressed_var"] * scale
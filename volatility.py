@@ -0,0 +1,145 @@
+"""Per-symbol EWMA true range (ATR) for suggesting stop distances.
+
+State lives in flat numpy arrays indexed by a symbol slot, so thousands of
+symbols cost a few dozen bytes each and a new bar is O(1). Bars come from
+OHLC history (backfill, vectorized) or are built from quotes (update_quote,
+one bar per bar_seconds of mid prices).
+
+    engine = VolatilityEngine(period=14)
+    engine.backfill_file("bars.csv")          # symbol,timestamp,high,low,close
+    engine.backfill_archive("archive/")       # see ohlc_archive.py
+    engine.suggest_stop("ES", 0.25, k=1.5)    # ticks
+"""
+import math
+import threading
+
+import numpy as np
+
+class VolatilityEngine:
+    def __init__(self, period=14, bar_seconds=60, capacity=64):
+        self.period = period
+        self.alpha = 1.0 / period  # Wilder smoothing
+        self.bar_seconds = bar_seconds
+        self.slots = {}
+        self.lock = threading.Lock()
+        self.atr = np.zeros(capacity)
+        self.prev_close = np.full(capacity, np.nan)
+        self.bars = np.zeros(capacity, dtype=np.int64)
+        # Bar being built from quotes
+        self.bar_start = np.full(capacity, np.nan)
+        self.bar_high = np.zeros(capacity)
+        self.bar_low = np.zeros(capacity)
+        self.bar_close = np.zeros(capacity)
+
+    def slot(self, symbol):
+        i = self.slots.get(symbol)
+        if i is None:
+            i = self.slots[symbol] = len(self.slots)
+            if i == len(self.atr):
+                self.grow(2 * i)
+        return i
+
+    def grow(self, capacity):
+        extra = capacity - len(self.atr)
+        self.atr = np.concatenate([self.atr, np.zeros(extra)])
+        self.prev_close = np.concatenate([self.prev_close, np.full(extra, np.nan)])
+        self.bars = np.concatenate([self.bars, np.zeros(extra, dtype=np.int64)])
+        self.bar_start = np.concatenate([self.bar_start, np.full(extra, np.nan)])
+        self.bar_high = np.concatenate([self.bar_high, np.zeros(extra)])
+        self.bar_low = np.concatenate([self.bar_low, np.zeros(extra)])
+        self.bar_close = np.concatenate([self.bar_close, np.zeros(extra)])
+
+    def update_bar(self, symbol, high, low, close):
+        with self.lock:
+            self._update_slot(self.slot(symbol), high, low, close)
+
+    def _update_slot(self, i, high, low, close):
+        prev = self.prev_close[i]
+        tr = high - low if math.isnan(prev) else max(high - low, abs(high - prev), abs(low - prev))
+        self.atr[i] = tr if self.bars[i] == 0 else self.atr[i] + self.alpha * (tr - self.atr[i])
+        self.prev_close[i] = close
+        self.bars[i] += 1
+
+    def update_quote(self, symbol, timestamp, bid, ask):
+        # QuoteCache listener: aggregates mid prices into bars, closing a bar when its window ends
+        mid = (bid + ask) / 2
+        with self.lock:
+            i = self.slot(symbol)
+            start = self.bar_start[i]
+            if not math.isnan(start) and timestamp >= start + self.bar_seconds:
+                self._update_slot(i, self.bar_high[i], self.bar_low[i], self.bar_close[i])
+                start = math.nan
+            if math.isnan(start):
+                self.bar_start[i] = timestamp - timestamp % self.bar_seconds
+                self.bar_high[i] = self.bar_low[i] = mid
+            else:
+                self.bar_high[i] = max(self.bar_high[i], mid)
+                self.bar_low[i] = min(self.bar_low[i], mid)
+            self.bar_close[i] = mid
+
+    def backfill(self, symbols, high, low, close):
+        """Replace the state of every symbol present with the ATR over its bars.
+
+        Arrays are one row per bar, in time order within each symbol. The EWMA
+        of a whole series is a weighted sum, so this needs no per-bar loop.
+        """
+        symbols = np.asarray(symbols)
+        high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+        names, codes = np.unique(symbols, return_inverse=True)
+        order = np.argsort(codes, kind="stable")
+        codes, high, low, close = codes[order], high[order], low[order], close[order]
+
+        first = np.ones(len(codes), dtype=bool)
+        first[1:] = codes[1:] != codes[:-1]
+        prev = np.roll(close, 1)
+        tr = np.maximum(high - low, np.maximum(np.abs(high - prev), np.abs(low - prev)))
+        tr[first] = (high - low)[first]
+
+        counts = np.bincount(codes, minlength=len(names))
+        ends = np.cumsum(counts)
+        age = ends[codes] - 1 - np.arange(len(codes))  # bars after this one in its symbol
+        decay = 1.0 - self.alpha
+        weights = self.alpha * decay ** age
+        weights[first] = decay ** age[first]  # the first bar seeds the average
+        atr = np.bincount(codes, weights=weights * tr, minlength=len(names))
+
+        with self.lock:
+            slots = np.array([self.slot(str(name)) for name in names], dtype=np.int64)
+            self.atr[slots] = atr
+            self.prev_close[slots] = close[ends - 1]
+            self.bars[slots] = counts
+            self.bar_start[slots] = np.nan
+        return len(names)
+
+    def backfill_file(self, path):
+        import pandas as pd
+        df = pd.read_csv(path, comment="#")
+        if "timestamp" in df:
+            df = df.sort_values(["symbol", "timestamp"], kind="stable")
+        return self.backfill(df["symbol"].astype(str).str.strip().str.upper().to_numpy(),
+                             df["high"].to_numpy(), df["low"].to_numpy(), df["close"].to_numpy())
+
+    def backfill_archive(self, directory):
+        # Seed from an ohlc_archive directory; its stats are cached per archive version
+        from ohlc_archive import OhlcArchive
+        stats = OhlcArchive(directory).stats(self.period)
+        with self.lock:
+            for symbol, s in stats.items():
+                if s["bars"]:
+                    i = self.slot(symbol)
+                    self.atr[i] = s["atr"]
+                    self.prev_close[i] = s["last_close"]
+                    self.bars[i] = s["bars"]
+                    self.bar_start[i] = np.nan
+        return len(stats)
+
+    def get_atr(self, symbol):
+        i = self.slots.get(symbol)
+        return float(self.atr[i]) if i is not None and self.bars[i] else None
+
+    def suggest_stop(self, symbol, tick_size, k=1.5):
+        # k x ATR in whole ticks (rounded up), or None without history
+        atr = self.get_atr(symbol)
+        if atr is None or tick_size <= 0:
+            return None
+        return max(1, math.ceil(k * atr / tick_size - 1e-9))